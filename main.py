@@ -1,19 +1,23 @@
+import argparse
+import os
 import traceback
 
 import time
 import tcod
 
-from configparser import ConfigParser
-
+from src.action_stats import stats as action_stats
 import src.color as color
+from src.config import config
+import src.constants as constants
 import src.exceptions as exceptions
+from src.frame_profiler import profiler
 import src.input_handlers as input_handlers
+import src.memory_report as memory_report
+import src.session_profiler as session_profiler_module
+from src.session_profiler import session_profiler
 import src.setup_game as setup_game
 
-FPS = 1/60
-
-config = ConfigParser()
-config.read("config.ini")
+FPS = 1/60 # seconds per frame, the loop runs at this rate whether or not a frame is presented
 
 def save_game(handler: input_handlers.BaseEventHandler, filename: str) -> None:
     # if the current event handler has an active Engine then save it
@@ -21,7 +25,64 @@ def save_game(handler: input_handlers.BaseEventHandler, filename: str) -> None:
         handler.engine.save_as(filename)
         print("Game saved.")
 
+def toggle_session_profiler(handler: input_handlers.BaseEventHandler) -> None:
+    capturing = session_profiler.toggle()
+    if isinstance(handler, input_handlers.EventHandler):
+        if capturing:
+            handler.engine.message_log.add_message("Profiling started.")
+        else:
+            handler.engine.message_log.add_message(f"Profile written to {session_profiler.filename}.")
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=config.get("GAME INFO", "TITLE"))
+    parser.add_argument(
+        "--frame-log",
+        metavar="FILE",
+        help="write per-frame phase timings to a .csv or .jsonl file (F3 toggles the overlay)",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="trace allocations across floor transitions for the F5 memory report",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="FILE",
+        help="profile the session from launch and write it to FILE on exit (F6 starts and stops "
+        f"a sampling window), defaults to ${session_profiler_module.PROFILE_ENV}",
+    )
+    parser.add_argument(
+        "--profile-backend",
+        choices=session_profiler_module.BACKENDS,
+        default=os.environ.get(session_profiler_module.PROFILE_BACKEND_ENV, "cprofile"),
+    )
+    parser.add_argument(
+        "--profile-scope",
+        choices=session_profiler_module.SCOPES,
+        default=os.environ.get(session_profiler_module.PROFILE_SCOPE_ENV, "loop"),
+        help="profile the whole main loop, or only event handling and enemy turns",
+    )
+    args = parser.parse_args()
+
+    try:
+        session_profiler.configure(
+            args.profile or os.environ.get(session_profiler_module.PROFILE_ENV),
+            args.profile_backend,
+            args.profile_scope,
+        )
+    except ValueError as exc:
+        parser.error(str(exc))
+    return args
+
 def main():
+    args = parse_args()
+    if args.frame_log:
+        profiler.open_log(args.frame_log)
+    if args.trace_memory:
+        memory_report.tracker.start()
+    if args.profile or os.environ.get(session_profiler_module.PROFILE_ENV):
+        session_profiler.start()
+
     screen_width = int(config.get("GAME INFO", "SCREEN_WIDTH"))
     screen_height = int(config.get("GAME INFO", "SCREEN_HEIGHT"))
 
@@ -42,21 +103,63 @@ def main():
        vsync=True, 
     ) as context:
         root_console = tcod.console.Console(screen_width, screen_height, order="F")
+        presented_handler = None
+        presented_key = None
         try:
+            frame_deadline = time.perf_counter()
             while True:
-                root_console.clear()
-                handler.on_render(console=root_console)
-                context.present(root_console)
+                profiler.begin_frame()
+
+                # skip clearing, rendering and presenting while the frame would be identical
+                frame_key = handler.frame_key()
+                if (
+                    frame_key is None
+                    or frame_key != presented_key
+                    or handler is not presented_handler
+                    or profiler.overlay_visible
+                ):
+                    with profiler.phase("render"):
+                        root_console.clear()
+                        handler.on_render(console=root_console)
+                    overlay_bottom = profiler.render(root_console)
+                    if profiler.overlay_visible:
+                        action_stats.render(root_console, overlay_bottom)
+
+                    with profiler.phase("present"):
+                        context.present(root_console)
+                    presented_handler = handler
+                    presented_key = frame_key
 
                 try:
-                    for event in tcod.event.get():
-                        context.convert_event(event)
-                        handler = handler.handle_events(event)
+                    with profiler.phase("events"):
+                        for event in input_handlers.coalesce_mouse_motion(tcod.event.get()):
+                            if isinstance(event, tcod.event.WindowEvent):
+                                presented_handler = None # the window may need to be presented again
+                            if isinstance(event, tcod.event.KeyDown) and event.sym == constants.FRAME_PROFILER_KEY:
+                                profiler.toggle_overlay()
+                                action_stats.enabled = profiler.overlay_visible
+                                presented_handler = None # draw the frame again with or without the overlay
+                                continue
+                            if isinstance(event, tcod.event.KeyDown) and event.sym == constants.SESSION_PROFILER_KEY:
+                                toggle_session_profiler(handler)
+                                continue
+                            context.convert_event(event)
+                            with session_profiler.section():
+                                handler = handler.handle_events(event)
 
-                    if isinstance(handler, input_handlers.EventHandler):
-                        handler.real_time_update()
+                    with profiler.phase("real_time_update"), session_profiler.section():
+                        if isinstance(handler, input_handlers.EventHandler):
+                            handler.real_time_update()
 
-                    time.sleep(FPS)
+                    with profiler.phase("sleep"):
+                        # sleep until the next frame is due, skipped frames don't block on vsync
+                        # so a fixed sleep would run real time updates faster while idle
+                        frame_deadline += FPS
+                        delay = frame_deadline - time.perf_counter()
+                        if delay > 0:
+                            time.sleep(delay)
+                        else:
+                            frame_deadline = time.perf_counter() # running behind, don't catch up in a burst
                 except Exception: # handle exceptions in game
                     traceback.print_exc() # print error to stderr
 
@@ -65,6 +168,8 @@ def main():
                         handler.engine.message_log.add_message(
                             traceback.format_exc(), color.error
                         )
+
+                profiler.end_frame()
         except exceptions.QuitWithoutSaving:
             raise
         except SystemExit: # save and quit
@@ -73,6 +178,9 @@ def main():
         except BaseException: # save on any other unexpected exception
             save_game(handler, "savegame.sav")
             raise
+        finally:
+            profiler.close_log()
+            session_profiler.close() # also reached through the SystemExit save path
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
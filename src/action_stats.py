@@ -0,0 +1,124 @@
+# counts how often each action type and AI class is performed, fails and how long it takes
+from __future__ import annotations
+
+import functools
+import time
+from typing import Any, Dict, List, Tuple, TYPE_CHECKING
+
+import src.color as color
+import src.exceptions as exceptions
+
+if TYPE_CHECKING:
+    from tcod import Console
+
+class ActionCounter:
+    def __init__(self) -> None:
+        self.performs = 0
+        self.failures = 0 # performs that ended in exceptions.Impossible, or AI commands which weren't possible
+        self.seconds = 0.0
+
+    @property
+    def failure_rate(self) -> float:
+        return self.failures / self.performs if self.performs else 0.0
+
+class ActionStats:
+    """
+        per action type and per AI class counters, only collected while enabled
+        every Action subclass has its `perform` wrapped by `instrument`
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.groups: Dict[str, Dict[str, ActionCounter]] = {"action": {}, "ai": {}}
+
+    def reset(self) -> None:
+        for counters in self.groups.values():
+            counters.clear()
+
+    def get_counter(self, group: str, name: str) -> ActionCounter:
+        counters = self.groups[group]
+        counter = counters.get(name)
+        if counter is None:
+            counter = counters[name] = ActionCounter()
+        return counter
+
+    def record(self, group: str, name: str, seconds: float, failed: bool) -> None:
+        counter = self.get_counter(group, name)
+        counter.performs += 1
+        counter.failures += failed
+        counter.seconds += seconds
+
+    def record_resolved(self, group: str, name: str, seconds: float, failed: bool) -> None:
+        # add the outcome of work queued by an earlier, already counted perform
+        # AI performs only emit commands, which fail or succeed once the command buffer runs them
+        counter = self.get_counter(group, name)
+        counter.failures += failed
+        counter.seconds += seconds
+
+    def instrument(self, cls: type) -> None:
+        # wrap the `perform` defined on `cls` so it is counted while stats are enabled
+        perform = cls.__dict__.get("perform")
+        if perform is None or getattr(perform, "__wrapped__", None) is not None:
+            return
+
+        name = cls.__name__
+
+        @functools.wraps(perform)
+        def instrumented_perform(action: Any) -> Any:
+            if not self.enabled:
+                return perform(action)
+
+            start = time.perf_counter()
+            try:
+                result = perform(action)
+            except exceptions.Impossible:
+                self.record(action.stats_group, name, time.perf_counter() - start, True)
+                raise
+            self.record(action.stats_group, name, time.perf_counter() - start, False)
+            return result
+
+        setattr(cls, "perform", instrumented_perform)
+
+    def rows(self, group: str) -> List[Tuple[str, ActionCounter]]:
+        # counters of a group, most expensive first
+        return sorted(self.groups[group].items(), key=lambda row: row[1].seconds, reverse=True)
+
+    def report(self) -> str:
+        lines = []
+        for group in self.groups:
+            lines.append(f"{group:<22}{'performs':>10}{'failed':>8}{'fail %':>8}{'total ms':>10}")
+            for name, counter in self.rows(group):
+                lines.append(
+                    f"  {name[:20]:<20}{counter.performs:>10}{counter.failures:>8}"
+                    f"{counter.failure_rate * 100:>8.1f}{counter.seconds * 1000:>10.2f}"
+                )
+        return "\n".join(lines)
+
+    def render(self, console: Console, y: int) -> None:
+        # draw the counters under the frame timing overlay
+        rows = [(group, name, counter) for group in self.groups for name, counter in self.rows(group)]
+        width = 42
+        x = console.width - width
+
+        console.draw_frame(
+            x=x,
+            y=y,
+            width=width,
+            height=len(rows) + 3,
+            title="Actions",
+            clear=True,
+            fg=color.white,
+            bg=color.black,
+        )
+        console.print(x=x + 1, y=y + 1, string=f"{'name':<18}{'count':>7}{'fail%':>6}{'ms':>9}")
+
+        for i, (group, name, counter) in enumerate(rows):
+            label = name if group == "action" else f"*{name}" # AI classes are marked with a star
+            console.print(
+                x=x + 1,
+                y=y + i + 2,
+                string=f"{label[:17]:<18}{counter.performs:>7}"
+                f"{counter.failure_rate * 100:>6.0f}{counter.seconds * 1000:>9.1f}",
+            )
+
+stats = ActionStats()
@@ -2,14 +2,55 @@ from __future__ import annotations
 
 from typing import Optional, Tuple, TYPE_CHECKING
 
+from src.action_stats import stats
 import src.color as color
 import src.exceptions as exceptions
 
 if TYPE_CHECKING:
     from engine import Engine
     from entity import Actor, Entity, Item
+    from game_map import GameMap
+
+def can_move_to(game_map: GameMap, dest_x: int, dest_y: int) -> bool:
+    # true if an actor could step onto (dest_x, dest_y), shared by MovementAction and AI commands
+    if not game_map.in_bounds(dest_x, dest_y):
+        # destination is out of bounds
+        return False
+    if not game_map.tiles["walkable"][dest_x, dest_y]:
+        # destination is blocked by a tile
+        return False
+    # destination is blocked by an entity
+    return game_map.get_blocking_entity_at_location(dest_x, dest_y) is None
+
+def attack(engine: Engine, attacker: Actor, target: Actor) -> None:
+    # resolve one melee attack, shared by MeleeAction and AI commands
+    damage = attacker.fighter.power - target.fighter.defense
+
+    attack_desc = f"{attacker.name.capitalize()} attacks {target.name}"
+    if attacker is engine.player:
+        attack_color = color.player_atk
+    else:
+        attack_color = color.enemy_atk
+
+    if damage > 0:
+        engine.message_log.add_message(
+            f"{attack_desc} for {damage} hit point", attack_color
+        )
+        target.fighter.hp -= damage
+    else:
+        engine.message_log.add_message(
+            f"{attack_desc} but does no damage.", attack_color
+        )
+    
+    attacker.wait = attacker.fighter.attack_speed
 
 class Action:
+    stats_group = "action" # which action_stats counters this class is recorded under
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        stats.instrument(cls) # count performs, failures and time while stats are enabled
+
     def __init__(self, entity: Actor) -> None:
         super().__init__()
         self.entity = entity
@@ -71,38 +112,11 @@ class MeleeAction(ActionWithDirection):
         if not target:
             raise exceptions.Impossible("Nothing to attack.")
         
-        damage = self.entity.fighter.power - target.fighter.defense
-
-        attack_desc = f"{self.entity.name.capitalize()} attacks {target.name}"
-        if self.entity is self.engine.player:
-            attack_color = color.player_atk
-        else:
-            attack_color = color.enemy_atk
-
-        if damage > 0:
-            self.engine.message_log.add_message(
-                f"{attack_desc} for {damage} hit point", attack_color
-            )
-            target.fighter.hp -= damage
-        else:
-            self.engine.message_log.add_message(
-                f"{attack_desc} but does no damage.", attack_color
-            )
-        
-        self.entity.wait = self.entity.fighter.attack_speed
+        attack(self.engine, self.entity, target)
 
 class MovementAction(ActionWithDirection):
     def perform(self) -> None:
-        dest_x, dest_y = self.dest_xy
-
-        if not self.engine.game_map.in_bounds(dest_x, dest_y):
-            # destination is out of bounds
-            raise exceptions.Impossible("That way is blocked.")
-        if not self.engine.game_map.tiles["walkable"][dest_x, dest_y]:
-            # destination is blocked by a tile
-            raise exceptions.Impossible("That way is blocked.")
-        if self.engine.game_map.get_blocking_entity_at_location(dest_x, dest_y):
-            # destination is blocked by an entity
+        if not can_move_to(self.engine.game_map, *self.dest_xy):
             raise exceptions.Impossible("That way is blocked.")
         
         self.entity.move(self.dx, self.dy)
@@ -129,7 +143,7 @@ class PickupAction(Action):
                 if len(inventory.items) >= inventory.capacity:
                     raise exceptions.Impossible("Your inventory is full.")
                 
-                self.engine.game_map.entities.remove(item)
+                self.engine.game_map.remove_entity(item)
                 item.parent = self.entity.inventory
                 inventory.items.append(item)
 
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from typing import List, Optional, TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from src.entity import Actor
+
+class ActorTable:
+    """
+        struct of arrays holding the frequently updated state of every actor on a map
+        each actor owns a stable slot id for as long as it stays on the map, and its
+        `x`, `y`, `wait`, `alerted` and `fighter.hp` attributes read and write these arrays
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.x = np.zeros(capacity, dtype=np.int32)
+        self.y = np.zeros(capacity, dtype=np.int32)
+        self.hp = np.zeros(capacity, dtype=np.int32)
+        self.wait = np.zeros(capacity, dtype=np.int32)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.alerted = np.zeros(capacity, dtype=bool)
+        self.in_use = np.zeros(capacity, dtype=bool)
+
+        self.actors: List[Optional[Actor]] = [None] * capacity
+        self.free_slots: List[int] = list(reversed(range(capacity)))
+
+        self.version = 0 # bumped whenever an actor moves, so cached frames know to redraw
+
+    @property
+    def capacity(self) -> int:
+        return len(self.actors)
+
+    @property
+    def live_slots(self) -> np.ndarray:
+        # slot ids of every actor that can still perform actions
+        return np.flatnonzero(self.in_use & self.alive)
+
+    def grow(self) -> None:
+        # double the size of every array, existing slot ids are kept
+        old_capacity = self.capacity
+        new_capacity = old_capacity * 2
+
+        for name in ("x", "y", "hp", "wait", "alive", "alerted", "in_use"):
+            old_array = getattr(self, name)
+            new_array = np.zeros(new_capacity, dtype=old_array.dtype)
+            new_array[:old_capacity] = old_array
+            setattr(self, name, new_array)
+
+        self.actors.extend([None] * old_capacity)
+        self.free_slots.extend(reversed(range(old_capacity, new_capacity)))
+
+    def attach(self, actor: Actor) -> None:
+        # give the actor a slot in this table, moving its state over from wherever it was stored
+        if actor._table is self:
+            return
+        if actor._table is not None:
+            actor._table.detach(actor)
+
+        if not self.free_slots:
+            self.grow()
+        slot = self.free_slots.pop()
+
+        self.x[slot] = actor._x
+        self.y[slot] = actor._y
+        self.hp[slot] = actor.fighter._hp
+        self.wait[slot] = actor._wait
+        self.alive[slot] = actor._ai is not None
+        self.alerted[slot] = actor._alerted
+        self.in_use[slot] = True
+        self.actors[slot] = actor
+
+        actor._table = self
+        actor._slot = slot
+
+    def detach(self, actor: Actor) -> None:
+        # copy the actor's state back onto the actor and free its slot
+        slot = actor._slot
+
+        actor._x = int(self.x[slot])
+        actor._y = int(self.y[slot])
+        actor.fighter._hp = int(self.hp[slot])
+        actor._wait = int(self.wait[slot])
+        actor._alerted = bool(self.alerted[slot])
+
+        self.in_use[slot] = False
+        self.alive[slot] = False
+        self.actors[slot] = None
+        self.free_slots.append(slot)
+
+        actor._table = None
+        actor._slot = -1
+
+    def within(self, x: int, y: int, radius: float, inclusive: bool = True) -> np.ndarray:
+        # slot ids of living actors within a euclidean `radius` of (x, y)
+        # actors exactly `radius` away are only included if `inclusive` is true
+        slots = self.live_slots
+        dx = self.x[slots] - x
+        dy = self.y[slots] - y
+        distance = dx * dx + dy * dy
+        if inclusive:
+            return slots[distance <= radius * radius]
+        return slots[distance < radius * radius]
+
+    def at(self, x: int, y: int) -> np.ndarray:
+        # slot ids of living actors standing on (x, y)
+        return np.flatnonzero(self.in_use & self.alive & (self.x == x) & (self.y == y))
+
+    def occupants(self, x: int, y: int) -> np.ndarray:
+        # slot ids of every actor on (x, y), living or dead
+        return np.flatnonzero(self.in_use & (self.x == x) & (self.y == y))
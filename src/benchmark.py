@@ -0,0 +1,198 @@
+# repeatable benchmarks for the core hot paths
+# run with `python -m src.benchmark`, use `--json` for machine readable output
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import tcod
+
+import src.constants as constants
+import src.entity_factories as entity_factories
+from src.engine import Engine
+import src.procgen as procgen
+import src.setup_game as setup_game
+import src.stress as stress
+
+class BenchmarkCase:
+    def __init__(self, name: str, setup: Callable[[], Callable[[], None]], number: int = 1):
+        # `setup` builds any needed state and returns the function to time
+        # `number` is how many times the function is called per timed sample
+        self.name = name
+        self.setup = setup
+        self.number = number
+
+def build_engine(
+    seed: int, map_width: int, map_height: int, actors: int, scenario: Optional[str] = None
+) -> Engine:
+    # return a new game with at least `actors` monsters spawned on free floor tiles
+    # or a stress scenario floor using the given density preset
+    random.seed(seed)
+    engine = setup_game.new_game(constants.ENTITY_PLAYER_TYPE_HUMAN, map_width, map_height)
+    if scenario:
+        stress.build_scenario(engine, map_width, map_height, scenario, seed=seed)
+    else:
+        populate(engine, actors)
+    engine.update_fov()
+    return engine
+
+def populate(engine: Engine, actors: int) -> None:
+    game_map = engine.game_map
+    missing = actors - (len(list(game_map.actors)) - 1)
+    if missing <= 0:
+        return
+
+    free = game_map.tiles["walkable"] & (game_map.blockers == 0)
+    free_xs, free_ys = np.nonzero(free)
+    for index in random.sample(range(len(free_xs)), min(missing, len(free_xs))):
+        entity_factories.orc.spawn(game_map, int(free_xs[index]), int(free_ys[index]))
+
+def get_cases(args: argparse.Namespace) -> List[BenchmarkCase]:
+    def engine() -> Engine:
+        return build_engine(
+            args.seed, args.map_width, args.map_height, args.actors, args.scenario
+        )
+
+    def generate_dungeon() -> Callable[[], None]:
+        game = engine()
+        random.seed(args.seed)
+        world = game.game_world
+        return lambda: procgen.generate_dungeon(
+            max_rooms=world.max_rooms,
+            room_min_size=world.room_min_size,
+            room_max_size=world.room_max_size,
+            map_width=world.map_width,
+            map_height=world.map_height,
+            engine=game,
+        )
+
+    def update_fov() -> Callable[[], None]:
+        return engine().update_fov
+
+    def handle_enemy_turns() -> Callable[[], None]:
+        game = engine()
+        for actor in game.game_map.actors:
+            actor.alerted = True # make sure every actor is simulated
+        return game.handle_enemy_turns
+
+    def get_path_to() -> Callable[[], None]:
+        game = engine()
+        monsters = [actor for actor in game.game_map.actors if actor is not game.player]
+        player = game.player
+
+        def run() -> None:
+            for monster in monsters:
+                monster.ai.get_path_to(player.x, player.y)
+        return run
+
+    def game_map_render() -> Callable[[], None]:
+        game = engine()
+        game.game_map.visible[:] = True
+        console = tcod.console.Console(game.game_map.width, game.game_map.height, order="F")
+        return lambda: game.game_map.render(console)
+
+    def render_messages() -> Callable[[], None]:
+        game = engine()
+        for i in range(args.messages):
+            game.message_log.add_message(f"Benchmark message number {i} with some padding text.")
+        log = game.message_log
+        console = tcod.console.Console(log.width, log.height, order="F")
+        return lambda: log.render_messages(
+            console, 0, 0, log.width, log.height, log.messages
+        )
+
+    def save_as() -> Callable[[], None]:
+        game = engine()
+        filename = os.path.join(args.tmp_dir, "benchmark.sav")
+        return lambda: game.save_as(filename)
+
+    def load_game() -> Callable[[], None]:
+        filename = os.path.join(args.tmp_dir, "benchmark.sav")
+        engine().save_as(filename)
+        return lambda: setup_game.load_game(filename)
+
+    return [
+        BenchmarkCase("procgen.generate_dungeon", generate_dungeon),
+        BenchmarkCase("Engine.update_fov", update_fov, number=100),
+        BenchmarkCase("Engine.handle_enemy_turns", handle_enemy_turns, number=100),
+        BenchmarkCase("BaseAI.get_path_to", get_path_to),
+        BenchmarkCase("GameMap.render", game_map_render, number=10),
+        BenchmarkCase("MessageLog.render_messages", render_messages, number=10),
+        BenchmarkCase("Engine.save_as", save_as),
+        BenchmarkCase("setup_game.load_game", load_game),
+    ]
+
+def run_case(case: BenchmarkCase, repeat: int) -> List[float]:
+    # return the seconds per call of each timed sample
+    func = case.setup()
+    func() # warm up caches before timing
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(case.number):
+            func()
+        samples.append((time.perf_counter() - start) / case.number)
+    return samples
+
+def summarize(name: str, samples: List[float], args: argparse.Namespace) -> Dict[str, object]:
+    return {
+        "name": name,
+        "seed": args.seed,
+        "map_width": args.map_width,
+        "map_height": args.map_height,
+        "actors": args.actors,
+        "scenario": args.scenario,
+        "repeat": len(samples),
+        "min_s": min(samples),
+        "median_s": statistics.median(samples),
+        "mean_s": statistics.fmean(samples),
+        "max_s": max(samples),
+    }
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the game's hot paths.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--map-width", type=int, default=80)
+    parser.add_argument("--map-height", type=int, default=43)
+    parser.add_argument("--actors", type=int, default=50, help="minimum number of monsters on the map")
+    parser.add_argument(
+        "--scenario",
+        choices=sorted(stress.DENSITIES),
+        help="use a stress scenario floor with this density instead of --actors",
+    )
+    parser.add_argument("--messages", type=int, default=1000, help="message log length for render benchmarks")
+    parser.add_argument("--repeat", type=int, default=5, help="number of timed samples per benchmark")
+    parser.add_argument("--only", action="append", default=[], help="only run benchmarks containing this text")
+    parser.add_argument("--json", metavar="FILE", help="write results as JSON lines, use - for stdout")
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        args.tmp_dir = tmp_dir
+        for case in get_cases(args):
+            if args.only and not any(text in case.name for text in args.only):
+                continue
+            results.append(summarize(case.name, run_case(case, args.repeat), args))
+            if args.json != "-":
+                result = results[-1]
+                print(f"{case.name:<30} median {result['median_s'] * 1000:10.3f} ms  min {result['min_s'] * 1000:10.3f} ms")
+
+    if args.json:
+        lines = "".join(json.dumps(result, sort_keys=True) + "\n" for result in results)
+        if args.json == "-":
+            sys.stdout.write(lines)
+        else:
+            with open(args.json, "w") as f:
+                f.write(lines)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+# scripted bot player and a harness running many full games across processes, for balance and perf regressions
+from __future__ import annotations
+
+import argparse
+from collections import deque
+import json
+import multiprocessing
+import time
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+import numpy as np
+import tcod.path
+
+import src.actions as actions
+from src.components.consumable import (
+    ConfusionConsumable,
+    FireballDamageConsumable,
+    HealingConsumable,
+    LightningDamageConsumable,
+)
+import src.constants as constants
+from src.environment import RoguelikeEnv
+from src.equipment_types import EquipmentType
+
+if TYPE_CHECKING:
+    from src.engine import Engine
+    from src.entity import Actor, Item
+
+HEAL_BELOW = 0.5 # drink a potion once hp falls under this fraction of max hp
+SLOWEST_TURNS = 5 # number of slowest turns kept per game
+
+class Bot:
+    """
+        plays the game through the same actions as the player: heal when hurt, equip
+        upgrades, fight visible enemies, pick up items, explore, then take the stairs
+    """
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.path: Deque[Tuple[int, int]] = deque()
+        self.path_goal: Optional[Tuple[int, int]] = None
+        self.path_version = -1
+        self.explore_goal: Optional[Tuple[int, int]] = None
+
+    @property
+    def player(self) -> Actor:
+        return self.engine.player
+
+    def find_item(self, consumable_type: type) -> Optional[Item]:
+        for item in self.player.inventory.items:
+            if isinstance(item.consumable, consumable_type):
+                return item
+        return None
+
+    def move_towards(self, x: int, y: int) -> Optional[actions.Action]:
+        # follow a cached path to (x, y), recomputed when the goal or the map changes
+        player = self.player
+        game_map = self.engine.game_map
+        if (
+            not self.path
+            or self.path_goal != (x, y)
+            or self.path_version != game_map.version
+            or max(abs(self.path[0][0] - player.x), abs(self.path[0][1] - player.y)) != 1
+        ):
+            self.path = deque(game_map.get_path((player.x, player.y), (x, y)))
+            self.path_goal = x, y
+            self.path_version = game_map.version
+
+        if not self.path:
+            return None
+        next_x, next_y = self.path.popleft()
+        return actions.BumpAction(player, next_x - player.x, next_y - player.y)
+
+    def get_upgrade(self) -> Optional[Item]:
+        # an unequipped item with a bigger bonus than what is in its slot
+        equipment = self.player.equipment
+        for item in self.player.inventory.items:
+            if item.equipable is None or equipment.item_is_equipped(item):
+                continue
+            if item.equipable.equipment_type == EquipmentType.WEAPON:
+                current = equipment.weapon
+            else:
+                current = equipment.armor
+            if current is None or (
+                item.equipable.power_bonus + item.equipable.defense_bonus
+                > current.equipable.power_bonus + current.equipable.defense_bonus
+            ):
+                return item
+        return None
+
+    def fight(self, enemy: Actor) -> Optional[actions.Action]:
+        player = self.player
+        distance = max(abs(enemy.x - player.x), abs(enemy.y - player.y))
+        if distance <= 1:
+            return actions.BumpAction(player, enemy.x - player.x, enemy.y - player.y)
+
+        lightning = self.find_item(LightningDamageConsumable)
+        if lightning is not None and distance <= lightning.consumable.maximum_range:
+            return actions.ItemAction(player, lightning)
+
+        fireball = self.find_item(FireballDamageConsumable)
+        if fireball is not None and distance > fireball.consumable.radius:
+            return actions.ItemAction(player, fireball, (enemy.x, enemy.y))
+
+        confusion = self.find_item(ConfusionConsumable)
+        if confusion is not None and player.fighter.hp < player.fighter.max_hp * HEAL_BELOW:
+            return actions.ItemAction(player, confusion, (enemy.x, enemy.y))
+
+        return self.move_towards(enemy.x, enemy.y)
+
+    def get_explore_goal(self) -> Optional[Tuple[int, int]]:
+        # nearest reachable tile that has not been explored yet
+        game_map = self.engine.game_map
+        if self.explore_goal is not None and not game_map.explored[self.explore_goal]:
+            return self.explore_goal
+
+        walkable = game_map.tiles["walkable"]
+        distance = tcod.path.maxarray((game_map.width, game_map.height), order="F")
+        distance[self.player.x, self.player.y] = 0
+        tcod.path.dijkstra2d(distance, walkable, cardinal=2, diagonal=3, out=distance)
+
+        unexplored = walkable & ~game_map.explored & (distance < np.iinfo(distance.dtype).max)
+        if not unexplored.any():
+            self.explore_goal = None
+            return None
+
+        candidates = np.where(unexplored, distance, np.iinfo(distance.dtype).max)
+        x, y = np.unravel_index(np.argmin(candidates), candidates.shape)
+        self.explore_goal = int(x), int(y)
+        return self.explore_goal
+
+    def choose_action(self) -> actions.Action:
+        player = self.player
+        game_map = self.engine.game_map
+        fighter = player.fighter
+
+        if fighter.hp < fighter.max_hp * HEAL_BELOW:
+            potion = self.find_item(HealingConsumable)
+            if potion is not None:
+                return actions.ItemAction(player, potion)
+
+        upgrade = self.get_upgrade()
+        if upgrade is not None:
+            return actions.EquipAction(player, upgrade)
+
+        enemy = game_map.nearest_actor(
+            player.x, player.y, float("inf"), mask=game_map.visible, exclude=player
+        )
+        if enemy is not None:
+            action = self.fight(enemy)
+            if action is not None:
+                return action
+
+        inventory = player.inventory
+        if len(inventory.items) < inventory.capacity:
+            items = [item for item in game_map.items if game_map.visible[item.x, item.y]]
+            if items:
+                item = min(items, key=lambda item: max(abs(item.x - player.x), abs(item.y - player.y)))
+                if (item.x, item.y) == (player.x, player.y):
+                    return actions.PickupAction(player)
+                action = self.move_towards(item.x, item.y)
+                if action is not None:
+                    return action
+
+        goal = self.get_explore_goal()
+        if goal is not None:
+            action = self.move_towards(*goal)
+            if action is not None:
+                return action
+
+        stairs = game_map.downstairs_location
+        if game_map.explored[stairs]:
+            if (player.x, player.y) == stairs:
+                return actions.TakeStairsAction(player)
+            action = self.move_towards(*stairs)
+            if action is not None:
+                return action
+
+        return actions.WaitAction(player)
+
+def run_game(
+    seed: int,
+    character_cls: str = constants.ENTITY_PLAYER_TYPE_HUMAN,
+    max_turns: int = 5000,
+) -> Dict[str, Any]:
+    # play one game with the bot, return its depth and turn timings
+    env = RoguelikeEnv(character_cls)
+    env.reset(seed)
+    bot = Bot(env.engine)
+
+    durations = np.zeros(max_turns)
+    floors = np.zeros(max_turns, dtype=int)
+    invalid = 0
+    done = False
+    turns = 0
+
+    start = time.perf_counter()
+    while turns < max_turns and not done:
+        turn_start = time.perf_counter()
+        _, done, info = env.perform_action(bot.choose_action())
+        durations[turns] = time.perf_counter() - turn_start
+        floors[turns] = info["floor"]
+        invalid += not info["valid"]
+        turns += 1
+    seconds = time.perf_counter() - start
+
+    slowest = np.argsort(durations[:turns])[::-1][:SLOWEST_TURNS]
+    return {
+        "seed": seed,
+        "character": character_cls,
+        "depth": env.engine.game_world.current_floor,
+        "died": done,
+        "turns": turns,
+        "invalid_turns": invalid,
+        "seconds": seconds,
+        "turns_per_second": turns / seconds if seconds else 0.0,
+        "slowest_turns": [
+            {"turn": int(turn), "floor": int(floors[turn]), "ms": float(durations[turn] * 1000)}
+            for turn in slowest
+        ],
+    }
+
+def _run_game(arguments: Tuple[int, str, int]) -> Dict[str, Any]:
+    return run_game(*arguments)
+
+def run_games(
+    seeds: Sequence[int],
+    character_cls: str = constants.ENTITY_PLAYER_TYPE_HUMAN,
+    max_turns: int = 5000,
+    processes: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    # one game per seed, spread across a process pool, results are in seed order
+    arguments = [(seed, character_cls, max_turns) for seed in seeds]
+    if processes == 1:
+        return [_run_game(argument) for argument in arguments]
+
+    with multiprocessing.Pool(processes) as pool:
+        return pool.map(_run_game, arguments)
+
+def summarize(results: List[Dict[str, Any]]) -> str:
+    lines = [f"{'seed':>6}{'depth':>7}{'died':>6}{'turns':>8}{'turns/s':>10}{'slowest ms':>12}"]
+    for result in results:
+        slowest = result["slowest_turns"][0]["ms"] if result["slowest_turns"] else 0.0
+        lines.append(
+            f"{result['seed']:>6}{result['depth']:>7}{'yes' if result['died'] else 'no':>6}"
+            f"{result['turns']:>8}{result['turns_per_second']:>10.0f}{slowest:>12.2f}"
+        )
+
+    depths = np.array([result["depth"] for result in results])
+    turns = sum(result["turns"] for result in results)
+    seconds = sum(result["seconds"] for result in results)
+    lines.append(
+        f"depth mean {depths.mean():.2f} min {depths.min()} max {depths.max()}, "
+        f"{turns / seconds if seconds else 0.0:.0f} turns/s per process"
+    )
+
+    slowest = sorted(
+        ((turn["ms"], result["seed"], turn["turn"], turn["floor"])
+         for result in results for turn in result["slowest_turns"]),
+        reverse=True,
+    )[:SLOWEST_TURNS]
+    lines.append("slowest turns:")
+    for ms, seed, turn, floor in slowest:
+        lines.append(f"  {ms:8.2f} ms  seed {seed} turn {turn} floor {floor}")
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Play full games with a scripted bot.")
+    parser.add_argument("--games", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game, the rest count up")
+    parser.add_argument("--processes", type=int, default=None, help="defaults to one per core")
+    parser.add_argument("--max-turns", type=int, default=5000)
+    parser.add_argument(
+        "--character",
+        default=constants.ENTITY_PLAYER_TYPE_HUMAN,
+        choices=[
+            constants.ENTITY_PLAYER_TYPE_HUMAN,
+            constants.ENTITY_PLAYER_TYPE_MECH,
+            constants.ENTITY_PLAYER_TYPE_FUNGUS,
+        ],
+    )
+    parser.add_argument("--json", metavar="FILE", help="also write every result as JSON lines")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = run_games(
+        range(args.seed, args.seed + args.games), args.character, args.max_turns, args.processes
+    )
+    elapsed = time.perf_counter() - start
+
+    print(summarize(results))
+    print(f"{args.games} games in {elapsed:.1f}s")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            for result in results:
+                f.write(json.dumps(result) + "\n")
+
+if __name__ == "__main__":
+    main()
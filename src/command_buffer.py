@@ -0,0 +1,110 @@
+# compact AI action records, written by AI turns and executed by the engine in one pass
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from src.action_stats import stats
+from src.actions import attack, can_move_to
+
+if TYPE_CHECKING:
+    from src.engine import Engine
+
+COMMAND_MOVE = 0
+COMMAND_MELEE = 1
+COMMAND_BUMP = 2 # melee if an actor is at the destination, otherwise move
+
+# action_stats names, so AI commands are counted with the matching player actions
+COMMAND_NAMES = ("MovementAction", "MeleeAction", "BumpAction")
+
+class CommandBuffer:
+    """
+        (kind, slot, dx, dy) records in preallocated arrays, one per AI action
+        AIs decide on the state at the start of the tick and `emit` a record instead of
+        allocating Action objects, `execute` then resolves every record in emit order,
+        skipping ones which are no longer possible with the same checks as the player's actions
+        waiting is not a command, an AI which waits emits nothing
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.kind = np.zeros(capacity, dtype=np.int8)
+        self.slot = np.zeros(capacity, dtype=np.int32)
+        self.dx = np.zeros(capacity, dtype=np.int8)
+        self.dy = np.zeros(capacity, dtype=np.int8)
+        self.count = 0
+
+    @property
+    def capacity(self) -> int:
+        return len(self.kind)
+
+    def grow(self) -> None:
+        # double the size of every array, existing records are kept
+        for name in ("kind", "slot", "dx", "dy"):
+            old_array = getattr(self, name)
+            new_array = np.zeros(len(old_array) * 2, dtype=old_array.dtype)
+            new_array[: len(old_array)] = old_array
+            setattr(self, name, new_array)
+
+    def emit(self, kind: int, slot: int, dx: int, dy: int) -> None:
+        if self.count == self.capacity:
+            self.grow()
+        i = self.count
+        self.kind[i] = kind
+        self.slot[i] = slot
+        self.dx[i] = dx
+        self.dy[i] = dy
+        self.count = i + 1
+
+    def clear(self) -> None:
+        self.count = 0
+
+    def execute(self, engine: Engine) -> int:
+        # resolve every record and clear the buffer, return the number which were performed
+        count = self.count
+        if not count:
+            return 0
+        self.count = 0
+
+        game_map = engine.game_map
+        table = game_map.actor_table
+        recording = stats.enabled
+        performed = 0
+
+        for kind, slot, dx, dy in zip(
+            self.kind[:count].tolist(),
+            self.slot[:count].tolist(),
+            self.dx[:count].tolist(),
+            self.dy[:count].tolist(),
+        ):
+            actor = table.actors[slot]
+            if actor is None or not table.alive[slot]:
+                continue # killed earlier in this pass
+            if recording:
+                start = time.perf_counter()
+                ai_name = type(actor.ai).__name__ # the command may kill or change the AI
+
+            dest_x = actor.x + dx
+            dest_y = actor.y + dy
+            target = None
+            if kind != COMMAND_MOVE:
+                target = game_map.get_actor_at_location(dest_x, dest_y)
+
+            if target is not None:
+                attack(engine, actor, target)
+                done = True
+            elif kind != COMMAND_MELEE and can_move_to(game_map, dest_x, dest_y):
+                actor.move(dx, dy)
+                done = True
+            else:
+                done = False
+
+            performed += done
+            if recording:
+                elapsed = time.perf_counter() - start
+                stats.record("action", COMMAND_NAMES[kind], elapsed, not done)
+                # failed commands also count against the AI class which emitted them
+                stats.record_resolved("ai", ai_name, elapsed, not done)
+
+        return performed
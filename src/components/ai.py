@@ -1,12 +1,12 @@
 from __future__ import annotations
 
+from collections import deque
 import random
-from typing import List, Optional, Tuple, TYPE_CHECKING
+from typing import Deque, List, Optional, Tuple, TYPE_CHECKING
 
-import numpy as np
-import tcod
-
-from src.actions import Action, BumpAction, MeleeAction, MovementAction, WaitAction
+from src.actions import Action
+from src.command_buffer import COMMAND_BUMP, COMMAND_MELEE, COMMAND_MOVE
+import src.constants as constants
 
 if TYPE_CHECKING:
     from entity import Actor
@@ -15,38 +15,19 @@ if TYPE_CHECKING:
 
 class BaseAI(Action):
     entity: Actor
+    stats_group = "ai"
 
     def perform(self) -> None:
         raise NotImplementedError()
+
+    def emit(self, kind: int, dx: int, dy: int) -> None:
+        # queue this actor's action on the engine's command buffer, it's resolved after every AI has decided
+        self.engine.commands.emit(kind, self.entity._slot, dx, dy)
     
     def get_path_to(self, dest_x: int, dest_y: int) -> List[Tuple[int, int]]:
         # compute and return a path to the target position
         # or an empty list if there is no valid path
-
-        # copy the walkable array
-        cost = np.array(self.entity.gamemap.tiles["walkable"], dtype=np.int8)
-
-        for entity in self.entity.gamemap.entities:
-            # check an entity blocks movement and the cost isn't zero (blocking)
-            if entity.blocks_movement and cost[entity.x, entity.y]:
-
-                # Add to the cost of a blocked position.
-                # A lower number means more enemies will crowd behind each other in
-                # hallways.  A higher number means enemies will take longer paths in
-                # order to surround the player.
-                cost[entity.x, entity.y] += 10
-
-                # create a graph from the cost array and pass that graph to a new pathfinder
-                graph = tcod.path.SimpleGraph(cost=cost, cardinal=2, diagonal=3)
-                pathfinder = tcod.path.Pathfinder(graph)
-
-                pathfinder.add_root((self.entity.x, self.entity.y)) # start
-
-                # compute the path to the destination and remove the starting point
-                path: List[List[int]] = pathfinder.path_to((dest_x, dest_y))[1:].tolist()
-
-                # convert from List[List[int]] to List[Tuple[int, int]]
-                return [(index[0], index[1]) for index in path]
+        return self.entity.gamemap.get_path((self.entity.x, self.entity.y), (dest_x, dest_y))
             
 class ConfusedEnemy(BaseAI):
     """
@@ -87,12 +68,35 @@ class ConfusedEnemy(BaseAI):
 
             # The actor will either try to move or attack in the chosen random direction.
             # Its possible the actor will just bump into the wall, wasting a turn.
-            return BumpAction(self.entity, direction_x, direction_y,).perform()
+            self.emit(COMMAND_BUMP, direction_x, direction_y)
 
 class HostileEnemy(BaseAI):
     def __init__(self, entity: Actor):
         super().__init__(entity)
-        self.path: List[Tuple[int][int]] = []
+        self.path: Deque[Tuple[int, int]] = deque()
+        self.path_target: Optional[Tuple[int, int]] = None # target position the path was computed for
+        self.path_version = -1 # map version the path was computed for
+
+    def path_is_stale(self, target_x: int, target_y: int) -> bool:
+        # check if the cached path needs to be recomputed before following it
+        if not self.path or self.path_target is None:
+            return True
+        
+        game_map = self.engine.game_map
+        if self.path_version != game_map.version:
+            return True
+        
+        target_moved = max(
+            abs(target_x - self.path_target[0]), abs(target_y - self.path_target[1])
+        )
+        if target_moved > constants.HOSTILE_PATH_RECOMPUTE_DISTANCE:
+            return True
+        
+        next_x, next_y = self.path[0]
+        if max(abs(next_x - self.entity.x), abs(next_y - self.entity.y)) != 1:
+            return True # the actor was moved off its path
+        
+        return game_map.get_blocking_entity_at_location(next_x, next_y) is not None
 
     def perform(self) -> None:
         target = self.engine.player
@@ -105,14 +109,17 @@ class HostileEnemy(BaseAI):
         else:
             if self.engine.game_map.visible[self.entity.x, self.entity.y]:
                 if distance <= 1:
-                    return MeleeAction(self.entity, dx, dy).perform()
+                    return self.emit(COMMAND_MELEE, dx, dy)
                 
-                self.path = self.get_path_to(target.x, target.y)
+                if self.path_is_stale(target.x, target.y):
+                    self.path = deque(self.get_path_to(target.x, target.y))
+                    self.path_target = target.x, target.y
+                    self.path_version = self.engine.game_map.version
 
             if self.path:
-                dest_x, dest_y = self.path.pop(0)
-                return MovementAction(
-                    self.entity, dest_x - self.entity.x, dest_y - self.entity.y,
-                ).perform()
+                dest_x, dest_y = self.path.popleft()
+                return self.emit(
+                    COMMAND_MOVE, dest_x - self.entity.x, dest_y - self.entity.y,
+                )
         
-        return WaitAction(self.entity).perform()
\ No newline at end of file
+        # otherwise wait, which needs no command
\ No newline at end of file
@@ -60,8 +60,7 @@ class ConfusionConsumable(Consumable):
         self.engine.message_log.add_message(
             "Select a target location.", color.needs_target
         )
-        return SingleRangedAttackHandler(
-            self.engine,
+        return SingleRangedAttackHandler.get(self.engine).set_target(
             callback=lambda xy: actions.ItemAction(consumer, self.parent, xy),
         )
     
@@ -94,8 +93,7 @@ class FireballDamageConsumable(Consumable):
         self.engine.message_log.add_message(
             "Select a target location.", color.needs_target
         )
-        return AreaRangedAttackHandler(
-            self.engine,
+        return AreaRangedAttackHandler.get(self.engine).set_target(
             radius=self.radius,
             callback=lambda xy: actions.ItemAction(consumer, self.parent, xy),
         )
@@ -106,16 +104,14 @@ class FireballDamageConsumable(Consumable):
         if not self.engine.game_map.visible[target_xy]:
             raise Impossible("You cannot target an area that you cannot see.")
         
-        targets_hit = False
-        for actor in self.engine.game_map.actors:
-            if actor.disatance(*target_xy) <= self.radius:
-                self.engine.message_log.add_message(
-                    f"The {actor.name} is engulfed in a fiery explosion, taking {self.damage} damage!"
-                )
-                actor.fighter.take_damage(self.damage)
-                targets_hit = True
-
-        if not targets_hit:
+        targets = self.engine.game_map.actors_within(*target_xy, self.radius)
+        for actor in targets:
+            self.engine.message_log.add_message(
+                f"The {actor.name} is engulfed in a fiery explosion, taking {self.damage} damage!"
+            )
+            actor.fighter.take_damage(self.damage)
+
+        if not targets:
             raise Impossible("There are not targets in the radius.")
         self.consume()
 
@@ -126,16 +122,17 @@ class LightningDamageConsumable(Consumable):
 
     def activate(self, action: actions.ItemAction) -> None:
         consumer = action.entity
-        target = None
-        closest_distance = self.maximum_range + 1.0
-
-        for actor in self.engine.game_map.actors:
-            if actor is not consumer and self.parent.gamemap.visible[actor.x, actor.y]:
-                distance = consumer.distance(actor.x, actor.y)
-
-                if distance < closest_distance:
-                    target = actor
-                    closest_distance = distance
+        game_map = self.engine.game_map
+
+        # strikes anything closer than `maximum_range + 1`, so targets just past the range still count
+        target = game_map.nearest_actor(
+            consumer.x,
+            consumer.y,
+            self.maximum_range + 1,
+            mask=game_map.visible,
+            exclude=consumer,
+            inclusive=False,
+        )
 
         if target:
             self.engine.message_log.add_message(
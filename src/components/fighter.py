@@ -21,12 +21,24 @@ class Fighter(BaseComponent):
 
     @property
     def hp(self) -> int:
-        return self._hp
+        table = self.parent._table
+        if table is None:
+            return self._hp
+        return int(table.hp[self.parent._slot])
     
     @hp.setter
     def hp(self, value: int) -> None:
-        self._hp = max(0, min(value, self.max_hp))
-        if self._hp == 0 and self.parent.ai:
+        if value < self.hp:
+            self.parent.alerted = True # taking damage wakes up dormant actors
+
+        new_hp = max(0, min(value, self.max_hp))
+        table = self.parent._table
+        if table is None:
+            self._hp = new_hp
+        else:
+            table.hp[self.parent._slot] = new_hp
+
+        if new_hp == 0 and self.parent.ai:
             self.die()
 
     @property
@@ -65,10 +77,13 @@ class Fighter(BaseComponent):
 
         self.parent.char = "%"
         self.parent.color = (191, 0, 0)
+        if self.parent.blocks_movement:
+            self.gamemap.remove_blocker(self.parent.x, self.parent.y)
         self.parent.blocks_movement = False
         self.parent.ai = None
         self.parent.name = f"remains of {self.parent.name}"
         self.parent.render_order = RenderOrder.CORPSE        
+        self.gamemap.version += 1
 
         self.engine.message_log.add_message(death_message, death_message_color)
 
@@ -0,0 +1,5 @@
+# config.ini is parsed once, on first import, and shared by every module
+from configparser import ConfigParser
+
+config = ConfigParser()
+config.read("config.ini")
@@ -45,6 +45,10 @@ CONFIRM_KEYS = {
     tcod.event.K_KP_ENTER,
 }
 
+FRAME_PROFILER_KEY = tcod.event.K_F3 # toggles the frame timing overlay
+MEMORY_REPORT_KEY = tcod.event.K_F5 # writes a memory footprint report for the current floor
+SESSION_PROFILER_KEY = tcod.event.K_F6 # starts and stops a session profiler sampling window
+
 CURSOR_Y_KEYS = {
     tcod.event.K_UP: -1,
     tcod.event.K_DOWN: 1,
@@ -88,3 +92,10 @@ ENTITY_FUNGUS_BASE_COLOR = color.player_alive
 
 """ HOSTILE ENTITY CONSTANTS """
 
+HOSTILE_PATH_RECOMPUTE_DISTANCE = 2 # a cached path is recomputed once its target moves further than this
+
+""" ACTIVITY TIER CONSTANTS """
+
+ACTIVITY_REDUCED_PATH_DISTANCE = 20 # actors within this many steps of the player are simulated at a reduced rate
+ACTIVITY_REDUCED_TICK_INTERVAL = 4 # reduced tier actors are simulated once every N ticks
+ACTIVITY_DISTANCE_SLACK = 4 # path distances are reused until the player walks this many steps away
\ No newline at end of file
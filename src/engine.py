@@ -2,24 +2,24 @@ from __future__ import annotations
 
 import lzma
 import pickle
-from typing import TYPE_CHECKING
+from typing import Any, Dict, Hashable, Optional, Tuple, TYPE_CHECKING
 
+import numpy as np
 from tcod.console import Console
 from tcod.map import compute_fov
+import tcod.path
 
-from configparser import ConfigParser
-
-import src.exceptions as exceptions
+from src.config import config
+import src.constants as constants
+from src.command_buffer import CommandBuffer
+from src.frame_profiler import profiler
+from src.hud import Hud
 from src.message_log import MessageLog
-import src.render_functions as render_functions
 
 if TYPE_CHECKING:
     from entity import Actor
     from game_map import GameMap, GameWorld
 
-config = ConfigParser()
-config.read("config.ini")
-
 class Engine:
     FOV_RADIUS=int(config.get("GAME INFO", "DEFAULT_FOV_RADIUS")) 
 
@@ -34,16 +34,191 @@ class Engine:
         self.mouse_location = (0, 0)
         self.player = player
 
+        self.tick = 0
+        self.actors_simulated = 0 # number of actors simulated during the last tick
+        self.total_actors_simulated = 0
+
+        self.fov_version = 0 # bumped whenever `update_fov` recomputes the visible tiles
+
+        self._activity_distance: Optional[np.ndarray] = None
+        self._activity_distance_key: Optional[int] = None
+        self._activity_tiers: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+        self._activity_tiers_key: Optional[Tuple[int, ...]] = None
+
+        self._hud: Optional[Hud] = None
+        self.commands = CommandBuffer() # AI actions of the current tick
+        # event handlers reused by `EventHandler.get`, keyed by handler class
+        self.handlers: Dict[type, Any] = {}
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # HUD consoles are only a render cache, they are rebuilt on first render after loading
+        # and handlers are recreated on demand
+        state = self.__dict__.copy()
+        state["_hud"] = None
+        state["handlers"] = {}
+        return state
+
+    @property
+    def hud(self) -> Hud:
+        if self._hud is None:
+            self._hud = Hud(
+                int(config.get("GAME INFO", "SCREEN_WIDTH")),
+                int(config.get("GAME INFO", "SCREEN_HEIGHT")),
+            )
+        return self._hud
+
+    def compute_activity_distance(self) -> np.ndarray:
+        # path distance (in steps) from the player to every tile of the current map, exact up to
+        # the reduced tier distance plus the slack, and kept for `within_activity_distance`
+        # a path no longer than that never leaves the window around the player, so only the
+        # window is searched, tiles outside it keep the maximum distance
+        distance = tcod.path.maxarray((self.game_map.width, self.game_map.height), order="F")
+        radius = constants.ACTIVITY_REDUCED_PATH_DISTANCE + constants.ACTIVITY_DISTANCE_SLACK
+        window = (
+            slice(max(0, self.player.x - radius), self.player.x + radius + 1),
+            slice(max(0, self.player.y - radius), self.player.y + radius + 1),
+        )
+        local = distance[window]
+        local[self.player.x - window[0].start, self.player.y - window[1].start] = 0
+        tcod.path.dijkstra2d(
+            local, self.game_map.tiles["walkable"][window], cardinal=1, diagonal=1, out=local
+        )
+        self._activity_distance = distance
+        self._activity_distance_key = id(self.game_map)
+        return distance
+
+    def within_activity_distance(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """
+            mask of the tiles (xs, ys) within the reduced tier path distance of the player
+            the distances kept from where the player stood when they were computed are reused
+            while the player has walked at most the slack since: by the triangle inequality the
+            player's distance to a tile differs from the kept one by at most the distance walked,
+            so they are only recomputed when that can't decide every tile
+        """
+        radius = constants.ACTIVITY_REDUCED_PATH_DISTANCE
+        distance = self._activity_distance
+        if distance is not None and self._activity_distance_key == id(self.game_map):
+            walked = int(distance[self.player.x, self.player.y])
+            if walked <= constants.ACTIVITY_DISTANCE_SLACK:
+                kept = distance[xs, ys]
+                if not ((kept > radius - walked) & (kept <= radius + walked)).any():
+                    return kept <= radius - walked
+
+        return self.compute_activity_distance()[xs, ys] <= radius
+
+    def get_activity_tiers(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+            slots of every living actor except the player, with masks of the active and reduced
+            tier ones among them, the rest are dormant. Active actors are simulated every tick,
+            reduced ones every few ticks, dormant ones not at all
+            the result is reused until an actor moves, spawns, dies or is alerted, or the FOV
+            changes, so it must not be modified
+        """
+        game_map = self.game_map
+        table = game_map.actor_table
+        # actors are only ever alerted, never calmed, so their count tells if any was alerted
+        key = (
+            id(game_map),
+            game_map.version,
+            table.version,
+            self.fov_version,
+            int(np.count_nonzero(table.alerted)),
+        )
+        if self._activity_tiers is not None and self._activity_tiers_key == key:
+            return self._activity_tiers
+
+        slots = table.live_slots
+        slots = slots[slots != self.player._slot]
+        xs = table.x[slots]
+        ys = table.y[slots]
+
+        # actors in FOV are active, and once seen they keep chasing even when out of sight
+        active = game_map.visible[xs, ys]
+        table.alerted[slots[active]] = True
+        reduced = ~active & table.alerted[slots]
+
+        # a path is never shorter than the chebyshev distance, so path distances are only
+        # needed when a dormant actor is near enough to be reduced
+        radius = constants.ACTIVITY_REDUCED_PATH_DISTANCE
+        near = (
+            ~active & ~reduced
+            & (np.abs(xs - self.player.x) <= radius)
+            & (np.abs(ys - self.player.y) <= radius)
+        )
+        if near.any():
+            reduced[near] = self.within_activity_distance(xs[near], ys[near])
+
+        self._activity_tiers = slots, active, reduced
+        # alerting the active actors above is part of the state the result is valid for
+        key = key[:-1] + (int(np.count_nonzero(table.alerted)),)
+        self._activity_tiers_key = key
+        return self._activity_tiers
+
     def handle_enemy_turns(self) -> None:
-        for entity in set(self.game_map.actors) - {self.player}:
-            if entity.ai:
-                try:
-                    if entity.wait > 0:
-                        entity.wait -= 1
-                    else:
-                        entity.ai.perform()
-                except exceptions.Impossible:
-                    pass # ignore impossible action exceptions from AI
+        self.tick += 1
+        interval = constants.ACTIVITY_REDUCED_TICK_INTERVAL
+        table = self.game_map.actor_table
+        slots, active, reduced = self.get_activity_tiers()
+
+        # reduced tier actors are staggered so they don't all update on the same tick
+        reduced = reduced & ((self.tick + slots) % interval == 0)
+
+        elapsed = np.where(active, 1, np.where(reduced, interval, 0))
+        simulated = elapsed > 0
+        slots = slots[simulated]
+        elapsed = elapsed[simulated]
+
+        # count down every simulated actor's wait at once, then let the ready ones act
+        waits = table.wait[slots]
+        ready = slots[waits == 0]
+        table.wait[slots] = np.maximum(0, waits - elapsed)
+
+        for slot in ready.tolist():
+            entity = table.actors[slot]
+            if entity is None or not entity.ai:
+                continue
+            entity.ai.perform() # emits a command, nothing moves until every AI has decided
+        self.commands.execute(self)
+
+        self.actors_simulated = len(slots)
+        self.total_actors_simulated += len(slots)
+
+    def skip_idle_ticks(self, limit: int) -> int:
+        """
+            advance up to `limit` ticks at once while no actor would perform an action,
+            giving the same result as calling `handle_enemy_turns` once per tick
+            returns the number of ticks skipped, 0 if an actor acts on the next tick
+        """
+        interval = constants.ACTIVITY_REDUCED_TICK_INTERVAL
+        table = self.game_map.actor_table
+        slots, active, reduced = self.get_activity_tiers()
+        if limit <= 0:
+            return 0
+
+        simulated = active | reduced
+        if not simulated.any():
+            # every actor is dormant, the ticks pass without counting any wait down
+            self.tick += limit
+            self.actors_simulated = 0
+            return limit
+
+        # ticks until each actor acts: active ones count down one per tick, reduced ones
+        # count down `interval` on each of their staggered ticks and act on the one after
+        waits = table.wait[slots]
+        first = (-(self.tick + 1 + slots)) % interval
+        acts_in = np.where(active, waits, first + -(-waits // interval) * interval)
+        limit = min(limit, int(acts_in[simulated].min()))
+        if limit <= 0:
+            return 0
+
+        runs = np.where(first < limit, (limit - 1 - first) // interval + 1, 0)
+        elapsed = np.where(active, limit, np.where(reduced, runs * interval, 0))
+        table.wait[slots] = np.maximum(0, waits - elapsed)
+
+        self.tick += limit
+        self.actors_simulated = 0
+        self.total_actors_simulated += int(np.count_nonzero(active)) * limit + int(runs[reduced].sum())
+        return limit
 
     def update_fov(self) -> None:
         # compute the visible area based on the player's POV
@@ -55,40 +230,27 @@ class Engine:
 
         # add
         self.game_map.explored |= self.game_map.visible
+        self.fov_version += 1
             
-    def render(self, console: Console) -> None:
-        self.game_map.render(console)
-
-        self.message_log.render(
-            console=console, 
-            x=self.message_log.x, 
-            y=self.message_log.y, 
-            width=self.message_log.width, 
-            height=self.message_log.height
+    def frame_key(self) -> Hashable:
+        # everything a rendered frame depends on, if it is unchanged the last frame can be reused
+        return (
+            id(self.game_map),
+            self.game_map.version,
+            self.game_map.actor_table.version,
+            self.message_log.version,
+            self.mouse_location,
+            self.player.fighter.hp,
+            self.player.fighter.max_hp,
+            self.game_world.current_floor,
         )
 
-        render_functions.render_bar(
-            console=console,
-            current_value=self.player.fighter.hp,
-            maximum_value=self.player.fighter.max_hp,
-            total_width=int(config.get("GAME INFO", "HP_BAR_WIDTH")),
-        )
-
-        render_functions.render_dungeon_level(
-            console=console,
-            dungeon_level=self.game_world.current_floor,
-            location=(
-                int(config.get("GAME INFO", "DUNGEON_LEVEL_LBL_X")),
-                int(config.get("GAME INFO", "DUNGEON_LEVEL_LBL_Y"))    
-            ),
-        )
+    def render(self, console: Console) -> None:
+        with profiler.phase("GameMap.render"):
+            self.game_map.render(console)
 
-        render_functions.render_names_at_mouse_location(
-            console=console, 
-            x=int(config.get("GAME INFO", "AT_MOUSE_LBL_X")), 
-            y=int(config.get("GAME INFO", "AT_MOUSE_LBL_Y")), 
-            engine=self
-        )
+        with profiler.phase("Hud.render"):
+            self.hud.render(console, self)
 
     def save_as(self, filename: str) -> None:
         # save this engine isntance as a compressed file
@@ -13,6 +13,7 @@ from src.components.inventory import Inventory
 from src.components.level import Level
 
 if TYPE_CHECKING:
+    from src.actor_table import ActorTable
     from src.components.ai import BaseAI
     from src.components.consumable import Consumable
     from src.components.equipment import Equipment
@@ -49,7 +50,7 @@ class Entity:
         if parent:
             # if parent isn't provided now then it will be set later
             self.parent = parent
-            parent.entities.add(self)
+            parent.add_entity(self)
 
     @property
     def gamemap(self) -> GameMap:
@@ -60,29 +61,41 @@ class Entity:
         clone.x = x
         clone.y = y
         clone.parent = gamemap
-        gamemap.entities.add(clone)
+        gamemap.add_entity(clone)
         return clone
     
     def place(self, x: int, y: int, gamemap: Optional[GameMap] = None) -> None:
         # place this entity at a new location
-        self.x = x
-        self.y = y
         if gamemap:
             if hasattr(self, "parent"):
                 if self.parent is self.gamemap:
-                    self.gamemap.entities.remove(self)
+                    self.gamemap.remove_entity(self)
+            self.x = x
+            self.y = y
             self.parent = gamemap
-            gamemap.entities.add(self)
+            gamemap.add_entity(self)
+        else:
+            if self.blocks_movement and self.parent is self.gamemap:
+                self.gamemap.move_blocker(self.x, self.y, x, y)
+            self.x = x
+            self.y = y
 
     def distance(self, x: int, y: int) -> float:
         # return the distance between the current entity and given (x, y) coordinate
         return math.sqrt((x - self.x) ** 2 + (y - self.y) ** 2)
 
     def move(self, dx: int, dy: int) -> None:
+        if self.blocks_movement:
+            self.gamemap.move_blocker(self.x, self.y, self.x + dx, self.y + dy)
         self.x += dx
         self.y += dy
 
 class Actor(Entity):
+    # while an actor is on a map its hot state lives in the map's ActorTable,
+    # the underscored attributes only hold it while the actor is off the map
+    _table: Optional[ActorTable] = None
+    _slot: int = -1
+
     def __init__(
             self, 
             *, 
@@ -125,6 +138,72 @@ class Actor(Entity):
         self.speed = speed
         self.wait = 0
 
+        self.alerted = False # alerted actors are simulated even when far away from the player
+
+    @property
+    def x(self) -> int:
+        if self._table is None:
+            return self._x
+        return int(self._table.x[self._slot])
+    
+    @x.setter
+    def x(self, value: int) -> None:
+        if self._table is None:
+            self._x = value
+        else:
+            self._table.x[self._slot] = value
+            self._table.version += 1
+
+    @property
+    def y(self) -> int:
+        if self._table is None:
+            return self._y
+        return int(self._table.y[self._slot])
+    
+    @y.setter
+    def y(self, value: int) -> None:
+        if self._table is None:
+            self._y = value
+        else:
+            self._table.y[self._slot] = value
+            self._table.version += 1
+
+    @property
+    def wait(self) -> int:
+        if self._table is None:
+            return self._wait
+        return int(self._table.wait[self._slot])
+    
+    @wait.setter
+    def wait(self, value: int) -> None:
+        if self._table is None:
+            self._wait = value
+        else:
+            self._table.wait[self._slot] = value
+
+    @property
+    def alerted(self) -> bool:
+        if self._table is None:
+            return self._alerted
+        return bool(self._table.alerted[self._slot])
+    
+    @alerted.setter
+    def alerted(self, value: bool) -> None:
+        if self._table is None:
+            self._alerted = value
+        else:
+            self._table.alerted[self._slot] = value
+
+    @property
+    def ai(self) -> Optional[BaseAI]:
+        return self._ai
+    
+    @ai.setter
+    def ai(self, value: Optional[BaseAI]) -> None:
+        self._ai = value
+        if self._table is not None:
+            self._table.alive[self._slot] = value is not None
+
     def move(self, dx: int, dy: int) -> None:
         super().move(dx=dx, dy=dy)     
 
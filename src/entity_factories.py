@@ -1,6 +1,5 @@
-from configparser import ConfigParser
-
-from typing import Optional
+# entity prototypes, each one is built on first access as `entity_factories.<name>` and then reused
+from typing import Callable, Dict, Optional
 
 from src.components.ai import HostileEnemy
 from src.components import consumable, equipable
@@ -8,14 +7,11 @@ from src.components.equipment import Equipment
 from src.components.fighter import Fighter
 from src.components.inventory import Inventory
 from src.components.level import Level
-from src.entity import Actor, Player, Item
+from src.entity import Actor, Entity, Player, Item
 
 import src.color as color
 import src.constants as constants
 
-config = ConfigParser()
-config.read("config.ini")
-
 """ ACTORS """
 
 def get_player(character_cls: str) -> Optional[Player]:
@@ -27,88 +23,120 @@ def get_player(character_cls: str) -> Optional[Player]:
             ai_cls=HostileEnemy,
             equipment=Equipment(),
             character_cls=character_cls
-        )        
+        )
 
     return None
 
-orc = Actor(
-    char="o", 
-    color=color.orc_alive, 
-    name="Orc", 
-    ai_cls=HostileEnemy,
-    equipment=Equipment(),
-    fighter=Fighter(
-        hp=10, 
-        base_defense=0, 
-        base_power=3, 
-        base_attack_speed=60
-    ),
-    inventory=Inventory(capacity=0),
-    level=Level(xp_given=35),
-    speed=30,
-)
-
-troll = Actor(
-    char="T", 
-    color=color.troll_alive, 
-    name="Troll",
-    ai_cls=HostileEnemy,
-    equipment=Equipment(),
-    fighter=Fighter(
-        hp=15, 
-        base_defense=1, 
-        base_power=4, 
-        base_attack_speed=60
-    ),
-    inventory=Inventory(capacity=0),
-    level=Level(xp_given=100),
-    speed=40,
-)
+def _orc() -> Actor:
+    return Actor(
+        char="o",
+        color=color.orc_alive,
+        name="Orc",
+        ai_cls=HostileEnemy,
+        equipment=Equipment(),
+        fighter=Fighter(
+            hp=10,
+            base_defense=0,
+            base_power=3,
+            base_attack_speed=60
+        ),
+        inventory=Inventory(capacity=0),
+        level=Level(xp_given=35),
+        speed=30,
+    )
+
+def _troll() -> Actor:
+    return Actor(
+        char="T",
+        color=color.troll_alive,
+        name="Troll",
+        ai_cls=HostileEnemy,
+        equipment=Equipment(),
+        fighter=Fighter(
+            hp=15,
+            base_defense=1,
+            base_power=4,
+            base_attack_speed=60
+        ),
+        inventory=Inventory(capacity=0),
+        level=Level(xp_given=100),
+        speed=40,
+    )
 
 """ POTIONS """
 
-health_potion = Item(
-    char="!",
-    color=color.health_potion,
-    name="Health Potion",
-    consumable=consumable.HealingConsumable(amount=4),
-)
+def _health_potion() -> Item:
+    return Item(
+        char="!",
+        color=color.health_potion,
+        name="Health Potion",
+        consumable=consumable.HealingConsumable(amount=4),
+    )
 
 """ SCROLLS """
 
-confusion_scroll = Item(
-    char="~",
-    color=color.confusion_scroll,
-    name="Confusion Scroll",
-    consumable=consumable.ConfusionConsumable(number_of_turns=10)
-)
-
-lightning_scroll = Item(
-    char="~",
-    color=color.lightning_scroll,
-    name="Lightning Scroll",
-    consumable=consumable.LightningDamageConsumable(damage=20, maximum_range=5),
-)
-
-fireball_scroll = Item(
-    char="~",
-    color=color.fireball_scroll,
-    name="Fireball Scroll",
-    consumable=consumable.FireballDamageConsumable(damage=12, radius=3),
-)
+def _confusion_scroll() -> Item:
+    return Item(
+        char="~",
+        color=color.confusion_scroll,
+        name="Confusion Scroll",
+        consumable=consumable.ConfusionConsumable(number_of_turns=10)
+    )
+
+def _lightning_scroll() -> Item:
+    return Item(
+        char="~",
+        color=color.lightning_scroll,
+        name="Lightning Scroll",
+        consumable=consumable.LightningDamageConsumable(damage=20, maximum_range=5),
+    )
+
+def _fireball_scroll() -> Item:
+    return Item(
+        char="~",
+        color=color.fireball_scroll,
+        name="Fireball Scroll",
+        consumable=consumable.FireballDamageConsumable(damage=12, radius=3),
+    )
 
 """ WEAPONS """
 
-dagger = Item(char="/", color=color.dagger, name="Dagger", equipable=equipable.Dagger())
-sword = Item(char="/", color=color.sword, name="Sword", equipable=equipable.Sword())
+def _dagger() -> Item:
+    return Item(char="/", color=color.dagger, name="Dagger", equipable=equipable.Dagger())
 
-""" EQUIPMENT """
+def _sword() -> Item:
+    return Item(char="/", color=color.sword, name="Sword", equipable=equipable.Sword())
 
-leather_armor = Item(
-    char="[",
-    color=color.leather_armor,
-    name="Leather Armor",
-    equipable=equipable.LeatherArmor(),
-)
+""" EQUIPMENT """
 
-chain_mail = Item(char="[", color=color.chain_mail, name="Chain Mail", equipable=equipable.ChainMail())
\ No newline at end of file
+def _leather_armor() -> Item:
+    return Item(
+        char="[",
+        color=color.leather_armor,
+        name="Leather Armor",
+        equipable=equipable.LeatherArmor(),
+    )
+
+def _chain_mail() -> Item:
+    return Item(char="[", color=color.chain_mail, name="Chain Mail", equipable=equipable.ChainMail())
+
+PROTOTYPES: Dict[str, Callable[[], Entity]] = {
+    "orc": _orc,
+    "troll": _troll,
+    "health_potion": _health_potion,
+    "confusion_scroll": _confusion_scroll,
+    "lightning_scroll": _lightning_scroll,
+    "fireball_scroll": _fireball_scroll,
+    "dagger": _dagger,
+    "sword": _sword,
+    "leather_armor": _leather_armor,
+    "chain_mail": _chain_mail,
+}
+
+def __getattr__(name: str) -> Entity:
+    # build a prototype the first time it's used, it's then a module global so this isn't called again
+    builder = PROTOTYPES.get(name)
+    if builder is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    prototype = globals()[name] = builder()
+    return prototype
@@ -0,0 +1,159 @@
+# per-frame timing of the main loop phases, shown as an overlay and optionally dumped to a file
+from __future__ import annotations
+
+import csv
+import json
+import time
+from collections import deque
+from contextlib import nullcontext
+from typing import Any, Deque, Dict, IO, Optional, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+import src.color as color
+
+if TYPE_CHECKING:
+    from tcod import Console
+
+_DISABLED = nullcontext()
+
+class _Phase:
+    # reusable context manager which adds its elapsed time to the current frame
+    def __init__(self, profiler: FrameProfiler, name: str):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        frame = self.profiler.frame
+        frame[self.name] = frame.get(self.name, 0.0) + time.perf_counter() - self.start
+
+class FrameProfiler:
+    """
+        collects how long each phase of a frame takes while enabled
+        keeps a rolling window of samples for percentiles, and can write every
+        frame to a CSV (.csv) or JSON lines (any other extension) file
+        CSV files have one `frame_number,phase,seconds` row per phase of a frame, so phases
+        which only start later, like the in-game ones after the main menu, are kept
+    """
+
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self, window: int = 300):
+        self.window = window
+        self.enabled = False
+        self.overlay_visible = False
+
+        self.frame_number = 0
+        self.frame: Dict[str, float] = {}
+        self.samples: Dict[str, Deque[float]] = {}
+        self._frame_start = 0.0
+        self._phases: Dict[str, _Phase] = {}
+
+        self._log_file: Optional[IO[str]] = None
+        self._csv_writer: Optional[Any] = None
+
+    def phase(self, name: str) -> Any:
+        # `with profiler.phase("name"):` times the block, does nothing while disabled
+        if not self.enabled:
+            return _DISABLED
+
+        phase = self._phases.get(name)
+        if phase is None:
+            phase = self._phases[name] = _Phase(self, name)
+        return phase
+
+    def toggle_overlay(self) -> None:
+        self.overlay_visible = not self.overlay_visible
+        self.enabled = self.overlay_visible or self._log_file is not None
+
+    def open_log(self, filename: str) -> None:
+        self.close_log()
+        self._log_file = open(filename, "w", newline="")
+        if filename.endswith(".csv"):
+            self._csv_writer = csv.writer(self._log_file)
+            self._csv_writer.writerow(["frame_number", "phase", "seconds"])
+        self.enabled = True
+
+    def close_log(self) -> None:
+        if self._log_file is not None:
+            self._log_file.close()
+        self._log_file = None
+        self._csv_writer = None
+        self.enabled = self.overlay_visible
+
+    def begin_frame(self) -> None:
+        if not self.enabled:
+            return
+
+        self.frame = {}
+        self._frame_start = time.perf_counter()
+
+    def end_frame(self) -> None:
+        if not self.enabled or not self._frame_start:
+            return
+
+        self.frame["frame"] = time.perf_counter() - self._frame_start
+        self._frame_start = 0.0
+        self.frame_number += 1
+
+        for name, seconds in self.frame.items():
+            samples = self.samples.get(name)
+            if samples is None:
+                samples = self.samples[name] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+        if self._log_file is not None:
+            self.write_frame()
+
+    def write_frame(self) -> None:
+        if self._csv_writer is not None:
+            self._csv_writer.writerows(
+                (self.frame_number, name, seconds) for name, seconds in sorted(self.frame.items())
+            )
+        else:
+            self._log_file.write(
+                json.dumps({"frame_number": self.frame_number, **self.frame}, sort_keys=True) + "\n"
+            )
+
+    def percentiles(self, name: str) -> Tuple[float, ...]:
+        # rolling percentiles for a phase, in seconds
+        samples = self.samples.get(name)
+        if not samples:
+            return tuple(0.0 for _ in self.PERCENTILES)
+        return tuple(np.percentile(np.fromiter(samples, dtype=float), self.PERCENTILES))
+
+    def render(self, console: Console) -> int:
+        # draw the overlay in the top right corner of the console, return the row below it
+        if not self.overlay_visible:
+            return 0
+
+        names = sorted(self.samples, key=lambda name: (name != "frame", name))
+        width = 42
+        height = len(names) + 3
+        x = console.width - width
+
+        console.draw_frame(
+            x=x,
+            y=0,
+            width=width,
+            height=height,
+            title="Frame ms",
+            clear=True,
+            fg=color.white,
+            bg=color.black,
+        )
+        console.print(x=x + 1, y=1, string=f"{'phase':<21}{'p50':>6}{'p95':>6}{'p99':>6}")
+
+        for i, name in enumerate(names):
+            p50, p95, p99 = (value * 1000 for value in self.percentiles(name))
+            console.print(
+                x=x + 1, y=i + 2, string=f"{name[:20]:<21}{p50:6.2f}{p95:6.2f}{p99:6.2f}"
+            )
+
+        return height
+
+profiler = FrameProfiler()
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
-from typing import Iterable, Iterator, Optional, TYPE_CHECKING
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, TYPE_CHECKING
 
 import numpy as np
 from tcod.console import Console
+import tcod.path
 
+from src.actor_table import ActorTable
 from src.entity import Actor, Item
+from src.memory_report import tracker as memory_tracker
 import src.tile_types as tile_types
 
 if TYPE_CHECKING:
@@ -19,7 +22,6 @@ class GameMap:
     ):
         self.engine = engine
         self.width, self.height = width, height
-        self.entities = set(entities)
         self.tiles = np.full((width, height), fill_value=tile_types.wall, order="F")
     
         self.visible = np.full(
@@ -31,25 +33,135 @@ class GameMap:
 
         self.downstairs_location = (0, 0)
 
+        # incremented whenever entities are added, removed or stop blocking movement
+        # so cached paths know when to recompute
+        self.version = 0
+
+        # number of blocking entities on each tile
+        self.blockers = np.zeros((width, height), dtype=np.int16, order="F")
+
+        # positions, hp and timers of every actor on this map, for vectorized queries
+        self.actor_table = ActorTable()
+
+        # shared pathfinding cost grid, built from the tiles on first use and then
+        # updated in place as blocking entities move, spawn, die or are removed
+        self._path_cost: Optional[np.ndarray] = None
+        self._path_graph: Optional[tcod.path.SimpleGraph] = None
+        self._pathfinder: Optional[tcod.path.Pathfinder] = None
+
+        # glyphs of every entity in render order, rebuilt when `version` changes
+        self._glyphs: Optional[Dict[str, np.ndarray]] = None
+        self._glyphs_version = -1
+
+        # names shown under the mouse, see `get_names_at_location`
+        self._names = ""
+        self._names_key: Optional[Tuple[Any, ...]] = None
+        self._names_quick_key: Optional[Tuple[int, ...]] = None
+
+        self.entities = set()
+        for entity in entities:
+            self.add_entity(entity)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # the pathfinding graph can't be pickled, it and the glyph cache are rebuilt on first use after loading
+        state = self.__dict__.copy()
+        state["_path_cost"] = None
+        state["_path_graph"] = None
+        state["_pathfinder"] = None
+        state["_glyphs"] = None
+        state["_glyphs_version"] = -1
+        return state
+
     @property
     def gamemap(self) -> GameMap:
         return self
 
+    @property
+    def path_cost(self) -> np.ndarray:
+        if self._path_cost is None:
+            # A lower crowding cost means more enemies will crowd behind each other in
+            # hallways.  A higher cost means enemies will take longer paths in
+            # order to surround the player.
+            self._path_cost = np.asfortranarray(
+                np.where(self.tiles["walkable"], 1 + self.blockers * 10, 0), dtype=np.int16
+            )
+        return self._path_cost
+
+    @property
+    def path_graph(self) -> tcod.path.SimpleGraph:
+        # the graph keeps a reference to `path_cost`, so in place updates are seen by every path
+        if self._path_graph is None:
+            self._path_graph = tcod.path.SimpleGraph(cost=self.path_cost, cardinal=2, diagonal=3)
+        return self._path_graph
+
     @property
     def actors(self) -> Iterator[Actor]:
-        yield from (
-            entity
-            for entity in self.entities
-            if isinstance(entity, Actor) and entity.is_alive
-        )
+        actors = self.actor_table.actors
+        yield from (actors[slot] for slot in self.actor_table.live_slots)
 
     @property
     def items(self) -> Iterator[Item]:
         yield from (entity for entity in self.entities if isinstance(entity, Item))
 
+    def add_entity(self, entity: Entity) -> None:
+        if entity in self.entities:
+            return
+        
+        self.entities.add(entity)
+        if isinstance(entity, Actor):
+            self.actor_table.attach(entity)
+        if entity.blocks_movement:
+            self.add_blocker(entity.x, entity.y)
+        self.version += 1
+
+    def remove_entity(self, entity: Entity) -> None:
+        self.entities.remove(entity)
+        if entity.blocks_movement:
+            self.remove_blocker(entity.x, entity.y)
+        if isinstance(entity, Actor) and entity._table is self.actor_table:
+            self.actor_table.detach(entity)
+        self.version += 1
+
+    def add_blocker(self, x: int, y: int) -> None:
+        self.blockers[x, y] += 1
+        if self._path_cost is not None and self._path_cost[x, y]:
+            self._path_cost[x, y] += 10
+
+    def remove_blocker(self, x: int, y: int) -> None:
+        self.blockers[x, y] -= 1
+        if self._path_cost is not None and self._path_cost[x, y]:
+            self._path_cost[x, y] -= 10
+
+    def move_blocker(self, old_x: int, old_y: int, new_x: int, new_y: int) -> None:
+        self.remove_blocker(old_x, old_y)
+        self.add_blocker(new_x, new_y)
+
+    def get_path(
+        self, start: Tuple[int, int], dest: Tuple[int, int]
+    ) -> List[Tuple[int, int]]:
+        # compute and return a path between two positions, excluding the start
+        # or an empty list if there is no valid path
+        # one pathfinder is reused for every path, `clear` resets it for the new start
+        if self._pathfinder is None:
+            self._pathfinder = tcod.path.Pathfinder(self.path_graph)
+        pathfinder = self._pathfinder
+        pathfinder.clear()
+        pathfinder.add_root(start)
+
+        path: List[List[int]] = pathfinder.path_to(dest)[1:].tolist()
+
+        # convert from List[List[int]] to List[Tuple[int, int]]
+        return [(index[0], index[1]) for index in path]
+
     def get_blocking_entity_at_location(
         self, location_x: int, location_y: int
     ) -> Optional[Entity]:
+        if (
+            not self.in_bounds(location_x, location_y)
+            or not self.blockers[location_x, location_y]
+        ):
+            return None
+        
         for entity in self.entities:
             if (
                 entity.blocks_movement 
@@ -61,12 +173,61 @@ class GameMap:
         return None
 
     def get_actor_at_location(self, x: int, y: int) -> Optional[Actor]:
-        for actor in self.actors:
-            if actor.x == x and actor.y == y:
-                return actor
+        slots = self.actor_table.at(x, y)
+        if len(slots):
+            return self.actor_table.actors[slots[0]]
             
         return None
 
+    def actors_within(self, x: int, y: int, radius: float) -> List[Actor]:
+        # return every living actor within a euclidean `radius` of (x, y)
+        actors = self.actor_table.actors
+        return [actors[slot] for slot in self.actor_table.within(x, y, radius).tolist()]
+
+    def nearest_actor(
+        self,
+        x: int,
+        y: int,
+        max_range: float,
+        mask: Optional[np.ndarray] = None,
+        exclude: Optional[Actor] = None,
+        inclusive: bool = True,
+    ) -> Optional[Actor]:
+        # return the living actor closest to (x, y) within `max_range`, see `ActorTable.within`
+        # `mask` is an optional boolean map array, only actors standing on true tiles are considered
+        table = self.actor_table
+        slots = table.within(x, y, max_range, inclusive)
+        if exclude is not None and exclude._table is table:
+            slots = slots[slots != exclude._slot]
+        if mask is not None:
+            slots = slots[mask[table.x[slots], table.y[slots]]]
+        if not len(slots):
+            return None
+        
+        dx = table.x[slots] - x
+        dy = table.y[slots] - y
+        return table.actors[slots[np.argmin(dx * dx + dy * dy)]]
+
+    def get_names_at_location(self, x: int, y: int) -> str:
+        # names of the entities on a visible tile, the entity scan only runs when the
+        # entities on the map or the actors standing on the tile may have changed
+        if not self.in_bounds(x, y) or not self.visible[x, y]:
+            return ""
+
+        table = self.actor_table
+        quick_key = (x, y, self.version, table.version)
+        if quick_key == self._names_quick_key:
+            return self._names
+
+        key = (x, y, self.version, tuple(table.occupants(x, y).tolist()))
+        if key != self._names_key:
+            self._names = ", ".join(
+                entity.name for entity in self.entities if entity.x == x and entity.y == y
+            ).capitalize()
+            self._names_key = key
+        self._names_quick_key = quick_key
+        return self._names
+
     def in_bounds(self, x: int, y: int) -> bool:
         return 0 <= x < self.width and 0 <= y < self.height
     
@@ -77,16 +238,47 @@ class GameMap:
             default=tile_types.SHROUD,
         )
 
-        entities_sorted_for_rendering = sorted(
-            self.entities, key=lambda x: x.render_order.value
-        )
+        glyphs = self.glyphs
+        xs = glyphs["x"].copy()
+        ys = glyphs["y"].copy()
+        actors = glyphs["actor"]
+        slots = glyphs["slot"][actors]
+        xs[actors] = self.actor_table.x[slots] # actors move without changing the version
+        ys[actors] = self.actor_table.y[slots]
 
-        for entity in entities_sorted_for_rendering:
-            # only print entities that are in FOV
-            if self.visible[entity.x, entity.y]:
-                console.print(
-                    x=entity.x, y=entity.y, string=entity.char, fg=entity.color
-                )
+        # only draw entities that are in FOV
+        shown = np.flatnonzero(self.visible[xs, ys])
+        # keep the last entry, the one highest in render order, on each tile. Assigning with
+        # repeated indices doesn't guarantee which value is written, so repeats are dropped first
+        flat = xs[shown] * self.height + ys[shown]
+        _, last_reversed = np.unique(flat[::-1], return_index=True)
+        shown = shown[len(shown) - 1 - last_reversed]
+        xs = xs[shown]
+        ys = ys[shown]
+        tiles_rgb = console.tiles_rgb
+        tiles_rgb["ch"][xs, ys] = glyphs["ch"][shown]
+        tiles_rgb["fg"][xs, ys] = glyphs["fg"][shown]
+
+    @property
+    def glyphs(self) -> Dict[str, np.ndarray]:
+        # position, character and color of every entity sorted by render order, as arrays
+        # actor positions are stored as actor table slots and read when rendering
+        if self._glyphs is None or self._glyphs_version != self.version:
+            entities = sorted(self.entities, key=lambda x: x.render_order.value)
+            actor = np.array([isinstance(entity, Actor) for entity in entities], dtype=bool)
+            self._glyphs = {
+                "x": np.array([entity.x for entity in entities], dtype=np.int32),
+                "y": np.array([entity.y for entity in entities], dtype=np.int32),
+                "actor": actor,
+                "slot": np.array(
+                    [entity._slot if is_actor else 0 for entity, is_actor in zip(entities, actor)],
+                    dtype=np.intp,
+                ),
+                "ch": np.array([ord(entity.char) for entity in entities], dtype=np.int32),
+                "fg": np.array([entity.color for entity in entities], dtype=np.uint8).reshape(-1, 3),
+            }
+            self._glyphs_version = self.version
+        return self._glyphs
 
 class GameWorld:
     # holds the settings for the GameMap, and generates new maps when moving down the stairs
@@ -126,4 +318,6 @@ class GameWorld:
             map_width=self.map_width,
             map_height=self.map_height,
             engine=self.engine,
-        )
\ No newline at end of file
+        )
+
+        memory_tracker.on_floor_change(self.current_floor)
\ No newline at end of file
@@ -0,0 +1,160 @@
+# drive the game without a tcod context or window, for CI, simulation and profiling
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import Optional, Tuple
+
+import tcod
+
+from src.action_stats import stats as action_stats
+import src.actions as actions
+from src.config import config
+import src.constants as constants
+import src.exceptions as exceptions
+import src.input_handlers as input_handlers
+import src.memory_report as memory_report
+import src.setup_game as setup_game
+import src.stress as stress
+
+class HeadlessRunner:
+    """
+        runs an Engine built by `setup_game.new_game` with no SDL window
+        actions and synthetic tcod events are fed in directly, and frames can
+        optionally be rendered to an off-screen console
+    """
+
+    def __init__(
+        self,
+        character_cls: str = constants.ENTITY_PLAYER_TYPE_HUMAN,
+        seed: Optional[int] = None,
+        render: bool = False,
+    ):
+        if seed is not None:
+            random.seed(seed)
+
+        self.engine = setup_game.new_game(character_cls)
+        self.handler: input_handlers.BaseEventHandler = input_handlers.MainGameEventHandler.get(
+            self.engine
+        )
+
+        self.console: Optional[tcod.console.Console] = None
+        if render:
+            self.console = tcod.console.Console(
+                int(config.get("GAME INFO", "SCREEN_WIDTH")),
+                int(config.get("GAME INFO", "SCREEN_HEIGHT")),
+                order="F",
+            )
+
+        self.ticks = 0
+
+    @property
+    def player_alive(self) -> bool:
+        return self.engine.player.is_alive
+
+    def perform(self, action: actions.Action) -> bool:
+        # perform an action the same way a key press would, return true if it was valid
+        if not isinstance(self.handler, input_handlers.EventHandler):
+            return False
+
+        if not self.handler.handle_action(action):
+            return False
+
+        if not self.player_alive:
+            self.handler = input_handlers.GameOverEventHandler.get(self.engine)
+        elif self.engine.player.level.requires_level_up:
+            self.handler = input_handlers.LevelUpEventHandler.get(self.engine)
+        return True
+
+    def dispatch(self, event: tcod.event.Event) -> None:
+        # pass an event through the active handler, like the main loop does
+        self.handler = self.handler.handle_events(event)
+
+    def press(self, sym: int, mod: int = 0) -> None:
+        # dispatch a synthetic key press
+        self.dispatch(tcod.event.KeyDown(scancode=0, sym=sym, mod=mod))
+
+    def move_mouse(self, tile: Tuple[int, int]) -> None:
+        # dispatch a synthetic mouse motion over the given map tile
+        point = tcod.event.Point(*tile)
+        self.dispatch(tcod.event.MouseMotion(position=point, tile=point))
+
+    def tick(self, count: int = 1) -> None:
+        # advance the real time simulation by `count` frames
+        for _ in range(count):
+            if isinstance(self.handler, input_handlers.EventHandler):
+                self.handler.real_time_update()
+            if self.console is not None:
+                self.render()
+            self.ticks += 1
+
+    def render(self) -> tcod.console.Console:
+        # render the current frame to the off-screen console
+        if self.console is None:
+            raise RuntimeError("This runner was created without a console.")
+
+        self.console.clear()
+        self.handler.on_render(console=self.console)
+        return self.console
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the game without a window.")
+    parser.add_argument("--ticks", type=int, default=1000, help="number of frames to simulate")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument(
+        "--character", default=constants.ENTITY_PLAYER_TYPE_HUMAN, help="player character class"
+    )
+    parser.add_argument("--render", action="store_true", help="render every frame off-screen")
+    parser.add_argument(
+        "--wander", action="store_true", help="move the player in a random direction when it can act"
+    )
+    parser.add_argument(
+        "--scenario", choices=sorted(stress.DENSITIES), help="replace the first floor with a stress scenario"
+    )
+    parser.add_argument("--map-width", type=int, default=200, help="stress scenario map width")
+    parser.add_argument("--map-height", type=int, default=200, help="stress scenario map height")
+    parser.add_argument(
+        "--action-stats", action="store_true", help="print perform and failure counts per action type and AI class"
+    )
+    parser.add_argument(
+        "--memory-report", metavar="FILE", help="write a memory footprint report when the run ends"
+    )
+    parser.add_argument(
+        "--trace-memory", action="store_true", help="include tracemalloc growth across floor transitions"
+    )
+    args = parser.parse_args()
+
+    action_stats.enabled = args.action_stats
+    if args.trace_memory:
+        memory_report.tracker.start()
+
+    runner = HeadlessRunner(args.character, seed=args.seed, render=args.render)
+    if args.scenario:
+        stress.build_scenario(runner.engine, args.map_width, args.map_height, args.scenario)
+    directions = list(constants.MOVE_KEYS.values())
+
+    start = time.perf_counter()
+    try:
+        for _ in range(args.ticks):
+            if args.wander and runner.player_alive and runner.engine.player.wait == 0:
+                runner.perform(actions.BumpAction(runner.engine.player, *random.choice(directions)))
+            runner.tick()
+    except exceptions.QuitWithoutSaving:
+        pass
+    elapsed = time.perf_counter() - start
+
+    engine = runner.engine
+    print(f"ticks: {runner.ticks}")
+    print(f"seconds: {elapsed:.3f}")
+    print(f"ticks per second: {runner.ticks / elapsed if elapsed else 0.0:.1f}")
+    print(f"floor: {engine.game_world.current_floor}")
+    print(f"player hp: {engine.player.fighter.hp}/{engine.player.fighter.max_hp}")
+    print(f"actors simulated: {engine.total_actors_simulated}")
+    if args.action_stats:
+        print(action_stats.report())
+    if args.memory_report:
+        memory_report.write_report(engine, args.memory_report)
+
+if __name__ == "__main__":
+    main()
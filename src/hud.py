@@ -0,0 +1,135 @@
+# retained mode HUD widgets, each one redraws its own off-screen console only when its inputs change
+from __future__ import annotations
+
+from typing import Any, Hashable, List, TYPE_CHECKING
+
+from tcod.console import Console
+
+from src.config import config
+from src.frame_profiler import profiler
+import src.render_functions as render_functions
+
+if TYPE_CHECKING:
+    from src.engine import Engine
+
+class Widget:
+    """
+        a rectangular region of the HUD drawn to its own console
+        `get_key` returns everything the widget's drawing depends on, the console is
+        only redrawn when the key changes and is blitted onto the root console every frame
+    """
+
+    def __init__(self, x: int, y: int, width: int, height: int):
+        self.x = x
+        self.y = y
+        self.console = Console(width, height, order="F")
+        self.key: Any = None
+        self.redraws = 0
+
+    def get_key(self, engine: Engine) -> Hashable:
+        raise NotImplementedError()
+
+    def draw(self, engine: Engine) -> None:
+        # draw onto `self.console`, at widget relative coordinates
+        raise NotImplementedError()
+
+    def invalidate(self) -> None:
+        self.key = None
+
+    def render(self, console: Console, engine: Engine) -> None:
+        key = self.get_key(engine)
+        if key != self.key:
+            self.console.clear()
+            self.draw(engine)
+            self.key = key
+            self.redraws += 1
+
+        self.console.blit(console, self.x, self.y)
+
+class HealthBar(Widget):
+    def __init__(self) -> None:
+        self.total_width = int(config.get("GAME INFO", "HP_BAR_WIDTH"))
+        super().__init__(
+            int(config.get("GAME INFO", "HP_BAR_X")),
+            int(config.get("GAME INFO", "HP_BAR_Y")),
+            self.total_width,
+            1,
+        )
+
+    def get_key(self, engine: Engine) -> Hashable:
+        return engine.player.fighter.hp, engine.player.fighter.max_hp
+
+    def draw(self, engine: Engine) -> None:
+        render_functions.render_bar(
+            console=self.console,
+            current_value=engine.player.fighter.hp,
+            maximum_value=engine.player.fighter.max_hp,
+            total_width=self.total_width,
+            location=(0, 0),
+        )
+
+class DungeonLevel(Widget):
+    def __init__(self, width: int = 20):
+        super().__init__(
+            int(config.get("GAME INFO", "DUNGEON_LEVEL_LBL_X")),
+            int(config.get("GAME INFO", "DUNGEON_LEVEL_LBL_Y")),
+            width,
+            1,
+        )
+
+    def get_key(self, engine: Engine) -> Hashable:
+        return engine.game_world.current_floor
+
+    def draw(self, engine: Engine) -> None:
+        render_functions.render_dungeon_level(
+            console=self.console, dungeon_level=engine.game_world.current_floor, location=(0, 0)
+        )
+
+class NamesAtMouse(Widget):
+    def __init__(self, width: int):
+        x = int(config.get("GAME INFO", "AT_MOUSE_LBL_X"))
+        super().__init__(x, int(config.get("GAME INFO", "AT_MOUSE_LBL_Y")), width - x, 1)
+        self.names = ""
+
+    def get_key(self, engine: Engine) -> Hashable:
+        # entities can move under a still mouse, so the names themselves are the key, the lookup is cached
+        mouse_x, mouse_y = engine.mouse_location
+        self.names = render_functions.get_names_at_location(mouse_x, mouse_y, engine.game_map)
+        return self.names
+
+    def draw(self, engine: Engine) -> None:
+        self.console.print(x=0, y=0, string=self.names)
+
+class MessagePanel(Widget):
+    def __init__(self, width: int, height: int):
+        x = int(config.get("GAME INFO", "MESSAGE_LOG_X"))
+        y = int(config.get("GAME INFO", "MESSAGE_LOG_Y"))
+        super().__init__(x, y, width - x, height - y)
+
+    def get_key(self, engine: Engine) -> Hashable:
+        return engine.message_log.version
+
+    def draw(self, engine: Engine) -> None:
+        message_log = engine.message_log
+        with profiler.phase("MessageLog.render"):
+            message_log.render(
+                console=self.console, x=0, y=0, width=message_log.width, height=message_log.height
+            )
+
+class Hud:
+    # every widget drawn over the map, sized to fit a `width` x `height` root console
+    def __init__(self, width: int, height: int):
+        self.widgets: List[Widget] = [
+            MessagePanel(width, height),
+            HealthBar(),
+            DungeonLevel(),
+            NamesAtMouse(width),
+        ]
+
+    def invalidate(self) -> None:
+        for widget in self.widgets:
+            widget.invalidate()
+
+    def render(self, console: Console, engine: Engine) -> None:
+        for widget in self.widgets:
+            widget.render(console, engine)
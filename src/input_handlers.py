@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import os
 
-from typing import Callable, Optional, Tuple, TYPE_CHECKING, Union
+from typing import Callable, Hashable, Iterable, List, Optional, Tuple, TYPE_CHECKING, Union
 import tcod
 
 import tcod.event
@@ -19,8 +19,10 @@ from src.actions import (
 import src.color as color
 import src.exceptions as exceptions
 import src.constants as constants
+import src.memory_report as memory_report
 
 from src.entity import Player
+from src.frame_profiler import profiler
 
 if TYPE_CHECKING:
     from engine import Engine
@@ -35,17 +37,61 @@ ActionOrHandler = Union[Action, "BaseEventHandler"]
     MainGameEventHandler will be come the active handler
 """
 
+def coalesce_mouse_motion(events: Iterable[tcod.event.Event]) -> List[tcod.event.Event]:
+    # keep only the last mouse motion before each key press or click, handlers only use the
+    # latest mouse tile. Motions are merged across other events like key releases, while key
+    # presses and clicks keep their order relative to the motions kept
+    coalesced: List[Optional[tcod.event.Event]] = []
+    pending_motion = -1 # index of the motion kept since the last key press or click
+    for event in events:
+        if isinstance(event, tcod.event.MouseMotion):
+            if pending_motion >= 0:
+                coalesced[pending_motion] = None
+            pending_motion = len(coalesced)
+        elif isinstance(event, (tcod.event.KeyDown, tcod.event.MouseButtonEvent)):
+            pending_motion = -1
+        coalesced.append(event)
+    return [event for event in coalesced if event is not None]
+
 class BaseEventHandler(tcod.event.EventDispatch[ActionOrHandler]):
+    parent: Optional[BaseEventHandler] = None # the handler this one was pushed from
+
     def handle_events(self, event: tcod.event.Event) -> BaseEventHandler:
         # handle an event and return the next active event handler
         state = self.dispatch(event)
         if isinstance(state, BaseEventHandler):
-            return state
+            return self.switch_to(state)
         assert not isinstance(state, Action), f"{self!r} cannot handle actions"
         return self
 
+    def switch_to(self, handler: BaseEventHandler) -> BaseEventHandler:
+        # make `handler` the active handler, calling its `on_enter` if it wasn't already active
+        if handler is not self:
+            handler.on_enter()
+        return handler
+
+    def push(self, handler: BaseEventHandler) -> BaseEventHandler:
+        # open `handler` on top of this one, `pop` returns to this handler
+        handler.parent = self
+        return handler
+
+    def pop(self) -> Optional[BaseEventHandler]:
+        # return to the handler this one was pushed from
+        parent = self.parent
+        self.parent = None
+        return parent
+
+    def on_enter(self) -> None:
+        # called whenever this handler becomes the active handler
+        pass
+
     def on_render(self, console: tcod.Console) -> None:
         raise NotImplementedError()
+
+    def frame_key(self) -> Optional[Hashable]:
+        # everything `on_render` draws depends on, the main loop skips rendering and presenting
+        # while it is unchanged. None means the frame can't be cached and is always redrawn
+        return None
     
     def ev_quit(self, event: tcod.event.Quit) -> Optional[Action]:
         raise SystemExit()
@@ -54,7 +100,7 @@ class PopupMessage(BaseEventHandler):
     # display a popup text window
 
     def __init__(self, parent_handler: BaseEventHandler, text: str):
-        self.parent = parent_handler
+        parent_handler.push(self)
         self.text = text
 
     def on_render(self, console: tcod.Console) -> None:
@@ -72,30 +118,49 @@ class PopupMessage(BaseEventHandler):
             alignment=tcod.CENTER,
         )
 
+    def frame_key(self) -> Optional[Hashable]:
+        parent_key = self.parent.frame_key()
+        if parent_key is None:
+            return None
+        return parent_key, self.text
+
     def ev_keydown(self, event: tcod.event.KeyDown) -> Optional[BaseEventHandler]:
         # any key returns to the parent handler
-        return self.parent
+        return self.pop()
 
 class EventHandler(BaseEventHandler):
     def __init__(self, engine: Engine):
         self.engine = engine
 
-    def handle_events(self, event: tcod.event.Event) -> None:
+    @classmethod
+    def get(cls, engine: Engine) -> EventHandler:
+        # the instance of this handler kept by `engine`, so switching to it allocates nothing
+        handler = engine.handlers.get(cls)
+        if handler is None:
+            handler = engine.handlers[cls] = cls(engine)
+        return handler
+
+    def handle_events(self, event: tcod.event.Event) -> BaseEventHandler:
         # handle events for input handlers with an engine
         action_or_state = self.dispatch(event)
         if isinstance(action_or_state, BaseEventHandler):
-            return action_or_state
+            return self.switch_to(action_or_state)
         if self.handle_action(action_or_state):
             # a valid action was performed
+            self.parent = None # the action closes every pushed handler
             if not self.engine.player.is_alive:
                 #the player was killed sometime during or after the action
-                return GameOverEventHandler(self.engine)
+                return self.switch_to(GameOverEventHandler.get(self.engine))
             elif self.engine.player.level.requires_level_up:
-                return LevelUpEventHandler(self.engine)
-            return MainGameEventHandler(self.engine) # return to the main handler
+                return self.switch_to(LevelUpEventHandler.get(self.engine))
+            return self.switch_to(MainGameEventHandler.get(self.engine)) # return to the main handler
         
         return self
 
+    def pop(self) -> BaseEventHandler:
+        # handlers opened without a parent return to the main handler
+        return super().pop() or MainGameEventHandler.get(self.engine)
+
     def handle_action(self, action: Optional[Action]) -> bool:        
         # handle actions returned from event methods
         if action is None:
@@ -119,13 +184,17 @@ class EventHandler(BaseEventHandler):
     
     def on_render(self, console: tcod.Console) -> None:
         self.engine.render(console)
+
+    def frame_key(self) -> Optional[Hashable]:
+        return self.engine.frame_key()
     
 class MainGameEventHandler(EventHandler):  
     def real_time_update(self) -> None:
         if self.engine.player.wait > 0:
             self.engine.player.wait -= 1
             
-        self.engine.handle_enemy_turns()
+        with profiler.phase("handle_enemy_turns"):
+            self.engine.handle_enemy_turns()
 
     def ev_keydown(self, event: tcod.event.KeyDown) -> Optional[ActionOrHandler]:
         action: Optional[Action] = None
@@ -154,22 +223,27 @@ class MainGameEventHandler(EventHandler):
             raise SystemExit()
 
         elif key == tcod.event.K_v:
-            return HistoryViewer(self.engine)
+            return self.push(HistoryViewer.get(self.engine))
 
         elif key == tcod.event.K_g:
             action = PickupAction(player)
 
         elif key == tcod.event.K_i:
-            return InventoryActivateHandler(self.engine)
+            return self.push(InventoryActivateHandler.get(self.engine))
 
         elif key == tcod.event.K_d:
-            return InventoryDropHandler(self.engine)
+            return self.push(InventoryDropHandler.get(self.engine))
         
         elif key == tcod.event.K_c:
-            return CharacterScreenEventHandler(self.engine)
+            return self.push(CharacterScreenEventHandler.get(self.engine))
 
         elif key == tcod.event.K_SLASH:
-            return LookHandler(self.engine)
+            return self.push(LookHandler.get(self.engine))
+
+        elif key == constants.MEMORY_REPORT_KEY:
+            filename = f"memory_floor_{self.engine.game_world.current_floor}.txt"
+            memory_report.write_report(self.engine, filename)
+            self.engine.message_log.add_message(f"Memory report written to {filename}.")
 
         return action
     
@@ -192,30 +266,61 @@ class HistoryViewer(EventHandler):
 
     def __init__(self, engine: Engine):
         super().__init__(engine)
-        self.log_length = len(engine.message_log.messages)
+        self.log_length = 0
+        self.cursor = -1
+
+        # the history is drawn to an off-screen console, only redrawn when this key changes
+        self.log_console: Optional[tcod.console.Console] = None
+        self.drawn_key: Optional[Tuple[int, int]] = None
+
+    def on_enter(self) -> None:
+        # start at the newest message, the cached console is kept between openings
+        self.log_length = len(self.engine.message_log.messages)
         self.cursor = self.log_length - 1
 
     def on_render(self, console: tcod.Console) -> None:
         super().on_render(console)  # Draw the main state as the background.
 
-        log_console = tcod.Console(console.width - 6, console.height - 6)
+        message_log = self.engine.message_log
+        if len(message_log.messages) != self.log_length:
+            # Keep following the newest message if it was selected.
+            if self.cursor == self.log_length - 1:
+                self.cursor = len(message_log.messages) - 1
+            self.log_length = len(message_log.messages)
+
+        width = console.width - 6
+        height = console.height - 6
+        if self.log_console is None or (self.log_console.width, self.log_console.height) != (width, height):
+            self.log_console = tcod.console.Console(width, height, order="F")
+            self.drawn_key = None
+
+        key = (self.cursor, message_log.version)
+        if key != self.drawn_key:
+            log_console = self.log_console
+            log_console.clear()
+
+            # Draw a frame with a custom banner title.
+            log_console.draw_frame(0, 0, log_console.width, log_console.height)
+            log_console.print_box(
+                0, 0, log_console.width, 1, "┤Message history├", alignment=tcod.CENTER
+            )
 
-        # Draw a frame with a custom banner title.
-        log_console.draw_frame(0, 0, log_console.width, log_console.height)
-        log_console.print_box(
-            0, 0, log_console.width, 1, "┤Message history├", alignment=tcod.CENTER
-        )
+            # Render the message log up to the cursor, only the messages on screen are wrapped.
+            message_log.render_messages(
+                log_console,
+                1,
+                1,
+                log_console.width - 2,
+                log_console.height - 2,
+                message_log.messages,
+                self.cursor + 1,
+            )
+            self.drawn_key = key
 
-        # Render the message log using the cursor parameter.
-        self.engine.message_log.render_messages(
-            log_console,
-            1,
-            1,
-            log_console.width - 2,
-            log_console.height - 2,
-            self.engine.message_log.messages[: self.cursor + 1],
-        )
-        log_console.blit(console, 3, 3)
+        self.log_console.blit(console, 3, 3)
+
+    def frame_key(self) -> Optional[Hashable]:
+        return self.engine.frame_key(), self.cursor
 
     def ev_keydown(self, event: tcod.event.KeyDown) -> Optional[MainGameEventHandler]:
         # Fancy conditional movement to make it feel right.
@@ -235,7 +340,7 @@ class HistoryViewer(EventHandler):
         elif event.sym == tcod.event.K_END:
             self.cursor = self.log_length - 1  # Move directly to the last message.
         else:  # Any other key moves back to the main game state.
-            return MainGameEventHandler(self.engine)
+            return self.pop()
         return None
 
 class AskUserEventHandler(EventHandler):
@@ -261,7 +366,7 @@ class AskUserEventHandler(EventHandler):
     
     def on_exit(self) -> Optional[ActionOrHandler]:
         # called when the user is trying to exit or cancel an action
-        return MainGameEventHandler(self.engine)
+        return self.pop()
     
 class CharacterScreenEventHandler(AskUserEventHandler):
     TITLE = "Character Information"
@@ -476,11 +581,10 @@ class InventoryDropHandler(InventoryEventHandler):
     
 class SelectIndexHandler(AskUserEventHandler):
     # handles asking the user for an index on the map
-    def __init__(self, engine: Engine):
-        # sets the cursor to the player when this handler is constructed
-        super().__init__(engine)
+    def on_enter(self) -> None:
+        # sets the cursor to the player whenever this handler is opened
         player = self.engine.player
-        engine.mouse_location = player.x, player.y
+        self.engine.mouse_location = player.x, player.y
 
     def on_render(self, console: tcod.Console) -> None:
         # highlight the tile under the cursor
@@ -530,34 +634,44 @@ class SelectIndexHandler(AskUserEventHandler):
 
 class LookHandler(SelectIndexHandler):
     # let's the player look around using the keyboard
-    def on_index_selected(self, x: int, y: int) -> MainGameEventHandler:
+    def on_index_selected(self, x: int, y: int) -> BaseEventHandler:
         # return to main handler
-        return MainGameEventHandler(self.engine)
+        return self.pop()
 
 class SingleRangedAttackHandler(SelectIndexHandler):
     # handles targeting a single enemy - Only the enemy selected will be affected
-    def __init__(
-        self, engine: Engine, callback: Callable[[Tuple[int, int]], Optional[Action]]
-    ):
+    # one instance is kept per engine, `set_target` sets the callback for each use
+    def __init__(self, engine: Engine):
         super().__init__(engine)
 
+        self.callback: Optional[Callable[[Tuple[int, int]], Optional[Action]]] = None
+
+    def set_target(
+        self, callback: Callable[[Tuple[int, int]], Optional[Action]]
+    ) -> SingleRangedAttackHandler:
+        # set the action made from the selected tile, returns this handler to switch to
         self.callback = callback
+        return self
 
     def on_index_selected(self, x: int, y: int) -> Optional[Action]:
         return self.callback((x, y))
     
 class AreaRangedAttackHandler(SelectIndexHandler):
     # handles targeting an area within a given radius - any entity within the area will be affected
-    def __init__(
-        self,
-        engine: Engine,
-        radius: int,
-        callback: Callable[[Tuple[int, int]], Optional[Action]],
-    ):
+    # one instance is kept per engine, `set_target` sets the radius and callback for each use
+    def __init__(self, engine: Engine):
         super().__init__(engine)
 
+        self.radius = 0
+        self.callback: Optional[Callable[[Tuple[int, int]], Optional[Action]]] = None
+
+    def set_target(
+        self, radius: int, callback: Callable[[Tuple[int, int]], Optional[Action]]
+    ) -> AreaRangedAttackHandler:
+        # set the area shown and the action made from the selected tile, returns this handler to switch to
         self.radius = radius
         self.callback = callback
+        return self
     
     def on_render(self, console: tcod.Console) -> None:
         # hightlight the tile under the cursor
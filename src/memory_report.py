@@ -0,0 +1,149 @@
+# memory footprint diagnostics for a floor, written as sorted `key value` lines so reports can be diffed
+from __future__ import annotations
+
+import sys
+import tracemalloc
+from collections import defaultdict
+from types import FunctionType, ModuleType
+from typing import Any, Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from src.engine import Engine
+
+def deep_size(obj: Any, seen: Optional[Set[int]] = None) -> int:
+    # approximate number of bytes reachable from `obj`, objects in `seen` are skipped
+    # classes, modules and functions are not followed
+    if seen is None:
+        seen = set()
+
+    size = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, (type, ModuleType, FunctionType)):
+            continue
+        seen.add(id(current))
+
+        size += sys.getsizeof(current) # includes the data buffer of arrays that own it
+        if isinstance(current, np.ndarray):
+            continue
+
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        elif not isinstance(current, (str, bytes, int, float, bool)):
+            if hasattr(current, "__dict__"):
+                stack.append(current.__dict__)
+            for slot in getattr(type(current), "__slots__", ()):
+                if hasattr(current, slot):
+                    stack.append(getattr(current, slot))
+
+    return size
+
+def collect(engine: Engine) -> Dict[str, int]:
+    # return the memory footprint of the current floor, in bytes, keyed by what owns it
+    game_map = engine.game_map
+    report: Dict[str, int] = {}
+
+    for name in ("tiles", "visible", "explored", "blockers"):
+        report[f"game_map.{name}"] = getattr(game_map, name).nbytes
+    if game_map._path_cost is not None:
+        report["game_map.path_cost"] = game_map._path_cost.nbytes
+
+    table = game_map.actor_table
+    report["game_map.actor_table"] = sum(
+        getattr(table, name).nbytes
+        for name in ("x", "y", "hp", "wait", "alive", "alerted", "in_use")
+    )
+
+    # shared objects are marked as seen so each entity only counts what it owns
+    shared = {id(engine), id(game_map), id(engine.game_world), id(table), id(engine.message_log)}
+    entity_totals: Dict[str, int] = defaultdict(int)
+    entity_counts: Dict[str, int] = defaultdict(int)
+    component_totals: Dict[str, int] = defaultdict(int)
+
+    for entity in game_map.entities:
+        seen = set(shared)
+        for attribute in ("fighter", "inventory", "equipment", "level", "ai", "consumable", "equipable"):
+            component = getattr(entity, attribute, None)
+            if component is not None:
+                # components are measured first so the entity total excludes them
+                seen.add(id(entity))
+                component_totals[type(component).__name__] += deep_size(component, seen)
+                seen.discard(id(entity))
+        entity_totals[type(entity).__name__] += deep_size(entity, seen)
+        entity_counts[type(entity).__name__] += 1
+
+    report["game_map.entities.set"] = sys.getsizeof(game_map.entities)
+    for name, size in entity_totals.items():
+        report[f"entities.{name}.bytes"] = size
+        report[f"entities.{name}.count"] = entity_counts[name]
+    for name, size in component_totals.items():
+        report[f"components.{name}.bytes"] = size
+
+    report["message_log.messages.count"] = len(engine.message_log.messages)
+    report["message_log.bytes"] = deep_size(engine.message_log)
+
+    return report
+
+class FloorMemoryTracker:
+    """
+        takes a tracemalloc snapshot on every floor transition while tracing,
+        so growth that survives moving to a new floor shows up in the report
+    """
+
+    def __init__(self, top: int = 10):
+        self.top = top
+        self.previous: Optional[tracemalloc.Snapshot] = None
+        self.floor_diffs: List[Tuple[int, Dict[str, int]]] = []
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self) -> None:
+        if not self.tracing:
+            tracemalloc.start()
+
+    def on_floor_change(self, floor: int) -> None:
+        if not self.tracing:
+            return
+
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__),)
+        )
+        if self.previous is not None:
+            diff: Dict[str, int] = {}
+            stats = snapshot.compare_to(self.previous, "lineno")
+            diff["total_diff"] = sum(stat.size_diff for stat in stats)
+            for stat in stats[: self.top]:
+                frame = stat.traceback[0]
+                diff[f"top.{frame.filename}:{frame.lineno}"] = stat.size_diff
+            self.floor_diffs.append((floor, diff))
+        self.previous = snapshot
+
+    def collect(self) -> Dict[str, int]:
+        report = {}
+        if self.tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            report["tracemalloc.current"] = current
+            report["tracemalloc.peak"] = peak
+        for floor, diff in self.floor_diffs:
+            for key, value in diff.items():
+                report[f"tracemalloc.floor_{floor}.{key}"] = value
+        return report
+
+tracker = FloorMemoryTracker()
+
+def format_report(report: Dict[str, int]) -> str:
+    return "".join(f"{key} {value}\n" for key, value in sorted(report.items()))
+
+def write_report(engine: Engine, filename: str) -> None:
+    report = collect(engine)
+    report.update(tracker.collect())
+    with open(filename, "w") as f:
+        f.write(format_report(report))
@@ -1,14 +1,10 @@
-from typing import Iterable, List, Reversible, Tuple
+from typing import Iterable, List, Optional, Sequence, Tuple
 import textwrap
 
 import tcod
 
-from configparser import ConfigParser
-
 import src.color as color
-
-config = ConfigParser()
-config.read("config.ini")
+from src.config import config
 
 class Message:
     def __init__(self, text: str, fg: Tuple[int, int, int]):
@@ -33,6 +29,7 @@ class MessageLog:
             height: int = int(config.get("GAME INFO", "DEFAULT_MESSAGE_LOG_HEIGHT"))
     ) -> None:
         self.messages: List[Message] = []
+        self.version = 0 # bumped whenever a message is added or stacked
         
         self.x = x
         self.y = y
@@ -48,6 +45,7 @@ class MessageLog:
             self.messages[-1].count += 1
         else:
             self.messages.append(Message(text, fg))
+        self.version += 1
 
     def render(
             self, console: tcod.console.Console, x: int, y: int, width: int, height: int,
@@ -72,13 +70,17 @@ class MessageLog:
         y: int,
         width: int,
         height: int,
-        messages: Reversible[Message],
+        messages: Sequence[Message],
+        end: Optional[int] = None,
     ) -> None:
-        # render the messages provided
-        # last message, first
+        # render the messages provided, up to but excluding index `end`
+        # last message, first, only the messages that fit are wrapped
         y_offset = height - 1
+        if end is None:
+            end = len(messages)
 
-        for message in reversed(messages):
+        for index in range(end - 1, -1, -1):
+            message = messages[index]
             for line in reversed(list(cls.wrap(message.full_text, width))):
                 console.print(x=x, y=y + y_offset, string=line, fg=message.fg)
                 y_offset -= 1
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import random
-from typing import Dict, Iterator, List, Tuple, TYPE_CHECKING
+from typing import Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING
 
 import tcod
 
@@ -24,19 +24,31 @@ max_monsters_by_floor = [
     (6, 5),
 ]
 
-item_chances: Dict[int, List[Tuple[Entity, int]]] = {
-    0: [(entity_factories.health_potion, 35)],
-    2: [(entity_factories.confusion_scroll, 10)],
-    4: [(entity_factories.lightning_scroll, 25), (entity_factories.sword, 5)],
-    6: [(entity_factories.fireball_scroll, 25), (entity_factories.chain_mail, 15)],
-}
-
-enemy_chances: Dict[int, List[Tuple[Entity, int]]] = {
-    0: [(entity_factories.orc, 80)],
-    3: [(entity_factories.troll, 15)],
-    5: [(entity_factories.troll, 30)],
-    7: [(entity_factories.troll, 60)],
-}
+# the chance tables reference entity prototypes, so they're built on first use rather than at import
+_item_chances: Optional[Dict[int, List[Tuple[Entity, int]]]] = None
+_enemy_chances: Optional[Dict[int, List[Tuple[Entity, int]]]] = None
+
+def get_item_chances() -> Dict[int, List[Tuple[Entity, int]]]:
+    global _item_chances
+    if _item_chances is None:
+        _item_chances = {
+            0: [(entity_factories.health_potion, 35)],
+            2: [(entity_factories.confusion_scroll, 10)],
+            4: [(entity_factories.lightning_scroll, 25), (entity_factories.sword, 5)],
+            6: [(entity_factories.fireball_scroll, 25), (entity_factories.chain_mail, 15)],
+        }
+    return _item_chances
+
+def get_enemy_chances() -> Dict[int, List[Tuple[Entity, int]]]:
+    global _enemy_chances
+    if _enemy_chances is None:
+        _enemy_chances = {
+            0: [(entity_factories.orc, 80)],
+            3: [(entity_factories.troll, 15)],
+            5: [(entity_factories.troll, 30)],
+            7: [(entity_factories.troll, 60)],
+        }
+    return _enemy_chances
 
 def get_max_value_for_floor(
     weighted_chances_by_floor: List[Tuple[int, int]], floor: int
@@ -114,10 +126,10 @@ def place_entities(room: RectangularRoom, dungeon: GameMap, floor_number: int) -
     )
 
     monsters: List[Entity] = get_entities_at_random(
-        enemy_chances, number_of_monsters, floor_number
+        get_enemy_chances(), number_of_monsters, floor_number
     )
     items: List[Entity] = get_entities_at_random(
-        item_chances, number_of_items, floor_number
+        get_item_chances(), number_of_items, floor_number
     )
 
     for entity in monsters + items:
@@ -155,7 +167,7 @@ def generate_dungeon(
     engine: Engine,
 ) -> GameMap:
     player = engine.player
-    dungeon = GameMap(engine, map_width, map_height, entities=[player])
+    dungeon = GameMap(engine, map_width, map_height)
 
     rooms: List[RectangularRoom] = []
 
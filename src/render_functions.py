@@ -1,33 +1,30 @@
 from __future__ import annotations
 
-from configparser import ConfigParser
-from typing import Tuple, TYPE_CHECKING
+from typing import Optional, Tuple, TYPE_CHECKING
 
 import src.color as color
+from src.config import config
 
 if TYPE_CHECKING:
     from tcod import Console
     from engine import Engine
     from game_map import GameMap
 
-config = ConfigParser()
-config.read("config.ini")
-
 def get_names_at_location(x: int, y: int, game_map: GameMap) -> str:
-    if not game_map.in_bounds(x, y) or not game_map.visible[x, y]:
-        return ""
-    
-    names = ", ".join(
-        entity.name for entity in game_map.entities if entity.x == x and entity.y == y
-    )
-
-    return names.capitalize()
+    # cached by the game map, hovering over the same tile doesn't scan the entities again
+    return game_map.get_names_at_location(x, y)
 
 def render_bar(
-    console: Console, current_value: int, maximum_value: int, total_width: int
+    console: Console,
+    current_value: int,
+    maximum_value: int,
+    total_width: int,
+    location: Optional[Tuple[int, int]] = None,
 ) -> None:
-    bar_x = int(config.get("GAME INFO", "HP_BAR_X"))
-    bar_y = int(config.get("GAME INFO", "HP_BAR_Y"))
+    # `location` defaults to the configured HP bar position
+    if location is None:
+        location = int(config.get("GAME INFO", "HP_BAR_X")), int(config.get("GAME INFO", "HP_BAR_Y"))
+    bar_x, bar_y = location
     bar_width = int(float(current_value) / maximum_value * total_width)
 
     console.draw_rect(
@@ -0,0 +1,148 @@
+# whole-session profiling with cProfile or pyinstrument, started from the command line or a key, dumped on exit
+from __future__ import annotations
+
+import cProfile
+from contextlib import nullcontext
+from typing import Any, List, Optional
+
+_DISABLED = nullcontext()
+
+BACKENDS = ("cprofile", "pyinstrument")
+SCOPES = ("loop", "simulation") # the whole main loop, or only event handling and enemy turns
+
+DEFAULT_FILENAMES = {"cprofile": "session.prof", "pyinstrument": "session.collapsed"}
+
+# environment variables read by main.py when the matching command line flags are not given
+PROFILE_ENV = "ROGUELIKE_PROFILE"
+PROFILE_BACKEND_ENV = "ROGUELIKE_PROFILE_BACKEND"
+PROFILE_SCOPE_ENV = "ROGUELIKE_PROFILE_SCOPE"
+
+class _Section:
+    # reusable context manager which profiles its block while a window is open
+    def __init__(self, profiler: SessionProfiler):
+        self.profiler = profiler
+
+    def __enter__(self) -> None:
+        self.profiler._enable()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.profiler._disable()
+
+class SessionProfiler:
+    """
+        profiles sampling windows of a play session, a window is opened at launch by
+        `--profile` or at any time with the profile key, and closed by the key or on exit
+        every window is added to the same profile, which is written each time one closes
+
+        cProfile writes pstats `.prof` files, pyinstrument writes collapsed stacks
+        (one `frame;frame;frame microseconds` line per stack) or HTML for `.html` files
+    """
+
+    def __init__(self) -> None:
+        self.backend = "cprofile"
+        self.scope = "loop"
+        self.filename: Optional[str] = None
+        self.capturing = False
+
+        self._profiler: Optional[Any] = None
+        self._section = _Section(self)
+
+    def configure(self, filename: Optional[str], backend: str = "cprofile", scope: str = "loop") -> None:
+        if backend == "pyinstrument":
+            # pyinstrument is optional, and starting it for every simulation section is too slow
+            try:
+                import pyinstrument # noqa: F401
+            except ImportError:
+                raise ValueError("The pyinstrument backend needs `pip install pyinstrument`.")
+            if scope != "loop":
+                raise ValueError("The pyinstrument backend can only profile the whole loop.")
+
+        self.backend = backend
+        self.scope = scope
+        self.filename = filename or DEFAULT_FILENAMES[backend]
+
+    def section(self) -> Any:
+        # `with session_profiler.section():` profiles the block in the simulation scope
+        if not self.capturing or self.scope != "simulation":
+            return _DISABLED
+        return self._section
+
+    def _enable(self) -> None:
+        if self.backend == "cprofile":
+            self._profiler.enable()
+        else:
+            self._profiler.start()
+
+    def _disable(self) -> None:
+        if self.backend == "cprofile":
+            self._profiler.disable()
+        else:
+            self._profiler.stop()
+
+    def start(self) -> None:
+        if self.capturing:
+            return
+        if self.filename is None:
+            self.configure(None)
+
+        if self._profiler is None:
+            if self.backend == "cprofile":
+                self._profiler = cProfile.Profile()
+            else:
+                from pyinstrument import Profiler
+                self._profiler = Profiler()
+
+        self.capturing = True
+        if self.scope == "loop":
+            self._enable()
+
+    def stop(self) -> None:
+        if not self.capturing:
+            return
+
+        if self.scope == "loop":
+            self._disable()
+        self.capturing = False
+        self.write()
+
+    def toggle(self) -> bool:
+        # open or close a sampling window, return true if one is now open
+        if self.capturing:
+            self.stop()
+        else:
+            self.start()
+        return self.capturing
+
+    def write(self) -> None:
+        if self._profiler is None:
+            return
+
+        if self.backend == "cprofile":
+            self._profiler.dump_stats(self.filename)
+        elif self.filename.endswith(".html"):
+            with open(self.filename, "w") as f:
+                f.write(self._profiler.output_html())
+        else:
+            lines: List[str] = []
+            root = self._profiler.last_session.root_frame() if self._profiler.last_session else None
+            if root is not None:
+                self.collapse(root, [], lines)
+            with open(self.filename, "w") as f:
+                f.writelines(lines)
+
+        print(f"Profile written to {self.filename}.")
+
+    def collapse(self, frame: Any, stack: List[str], lines: List[str]) -> None:
+        # append one collapsed stack line per pyinstrument frame with time spent in it
+        stack = stack + [f"{frame.function} ({frame.file_path_short}:{frame.line_no})"]
+        self_time = int(frame.self_time * 1_000_000)
+        if self_time > 0:
+            lines.append(f"{';'.join(stack)} {self_time}\n")
+        for child in frame.children:
+            self.collapse(child, stack, lines)
+
+    def close(self) -> None:
+        # close any open window, its profile is written out
+        self.stop()
+
+session_profiler = SessionProfiler()
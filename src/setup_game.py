@@ -5,29 +5,30 @@ import copy
 import lzma
 import pickle
 import traceback
-from typing import Optional
-from configparser import ConfigParser
+from typing import Hashable, Optional
 
+import numpy as np
 import tcod
 
 import src.color as color
+from src.config import config
 from src.engine import Engine
 import src.entity_factories as entity_factories
 from src.game_map import GameWorld
 import src.input_handlers as input_handlers
 import src.constants as constants
 
-config = ConfigParser()
-config.read("config.ini")
+background_image: Optional[np.ndarray] = None
 
-# load the background image and remove the alpha channel
-background_image = tcod.image.load(config.get("GAME INFO", "MAIN_MENU_BG_PATH"))[:, :, :3]
+def get_background_image() -> np.ndarray:
+    # load the background image on first use and remove the alpha channel
+    global background_image
+    if background_image is None:
+        background_image = tcod.image.load(config.get("GAME INFO", "MAIN_MENU_BG_PATH"))[:, :, :3]
+    return background_image
 
-def new_game(character_cls: str) -> Engine:
+def new_game(character_cls: str, map_width: int = 80, map_height: int = 43) -> Engine:
     # return a brand new game session as an Engine instance
-    map_width = 80
-    map_height = 43
-
     room_max_size = 10
     room_min_size = 6
     max_rooms = 30
@@ -80,7 +81,7 @@ class MainMenu(input_handlers.BaseEventHandler):
     # handle the main menu rendering and input
     def on_render(self, console: tcod.Console) -> None:
         # render the main menu on a background image
-        # console.draw_semigraphics(background_image, 0, 0)
+        # console.draw_semigraphics(get_background_image(), 0, 0)
 
         console.draw_frame(1, 1, console.width-2, console.height-2)
 
@@ -118,6 +119,9 @@ class MainMenu(input_handlers.BaseEventHandler):
             string="<"
         )
 
+    def frame_key(self) -> Optional[Hashable]:
+        return self.current_index
+
     def ev_keydown(
         self, event: tcod.event.KeyDown
     ) -> Optional[input_handlers.BaseEventHandler]:
@@ -128,7 +132,7 @@ class MainMenu(input_handlers.BaseEventHandler):
                 if self.current_index == 0:
                     return CharacterSelect()
                 elif self.current_index == 1:
-                    return input_handlers.MainGameEventHandler(load_game("savegame.sav"))
+                    return input_handlers.MainGameEventHandler.get(load_game("savegame.sav"))
                 elif self.current_index == 2:
                     raise SystemExit()                       
             except FileNotFoundError:
@@ -195,13 +199,16 @@ class CharacterSelect(input_handlers.BaseEventHandler):
             string=">"
         )
     
+    def frame_key(self) -> Optional[Hashable]:
+        return self.current_class
+
     def ev_keydown(
         self, event: tcod.event.KeyDown
     ) -> Optional[input_handlers.BaseEventHandler]:
         if event.sym in (tcod.event.K_q, tcod.event.K_ESCAPE):
             return MainMenu()
         elif event.sym in constants.CONFIRM_KEYS or event.sym == tcod.event.K_x:
-            return input_handlers.MainGameEventHandler(new_game(self.class_items[self.current_class]))
+            return input_handlers.MainGameEventHandler.get(new_game(self.class_items[self.current_class]))
         
         return None
     
@@ -0,0 +1,112 @@
+# time from launching python to the first main menu frame, with a budget for CI
+# run with `python -m src.startup_benchmark`, exits with status 1 when the median is over budget
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_BUDGET_MS = 750.0
+
+# imports everything main.py needs and draws the main menu to an off-screen console,
+# creating the SDL window is left out as it depends on the display rather than the game
+CHILD = """
+import tcod
+import main
+import src.setup_game as setup_game
+from src.config import config
+
+console = tcod.console.Console(
+    int(config.get("GAME INFO", "SCREEN_WIDTH")), int(config.get("GAME INFO", "SCREEN_HEIGHT")), order="F"
+)
+setup_game.MainMenu().on_render(console)
+"""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    # (module, self us, cumulative us) from `python -X importtime` output
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue # the header line
+        modules.append((fields[2].strip(), int(fields[0]), int(fields[1])))
+    return modules
+
+def run_once() -> Tuple[float, List[Tuple[str, int, int]]]:
+    # return the wall clock seconds to the first menu frame and the import times
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    seconds = time.perf_counter() - start
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr)
+        raise SystemExit(f"Startup benchmark failed with exit code {result.returncode}.")
+    return seconds, parse_importtime(result.stderr)
+
+def summarize(samples: List[float], modules: List[Tuple[str, int, int]], budget_ms: float) -> Dict[str, object]:
+    imports_us = sum(self_us for _, self_us, _ in modules)
+    project_us = sum(self_us for name, self_us, _ in modules if name == "main" or name.startswith("src"))
+    return {
+        "repeat": len(samples),
+        "min_s": min(samples),
+        "median_s": statistics.median(samples),
+        "max_s": max(samples),
+        "imports_s": imports_us / 1_000_000,
+        "project_imports_s": project_us / 1_000_000,
+        "budget_s": budget_ms / 1000,
+    }
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Time startup to the first main menu frame.")
+    parser.add_argument("--repeat", type=int, default=5, help="number of timed launches")
+    parser.add_argument(
+        "--budget", type=float, default=DEFAULT_BUDGET_MS, metavar="MS",
+        help="fail if the median launch takes longer than this",
+    )
+    parser.add_argument("--top", type=int, default=10, help="list this many of the slowest imports")
+    parser.add_argument("--json", metavar="FILE", help="write the result as JSON, use - for stdout")
+    args = parser.parse_args(argv)
+
+    run_once() # warm the disk cache and bytecode, cold starts can't be reproduced from here
+    samples = []
+    modules: List[Tuple[str, int, int]] = []
+    for _ in range(args.repeat):
+        seconds, modules = run_once()
+        samples.append(seconds)
+
+    result = summarize(samples, modules, args.budget)
+    if args.json:
+        line = json.dumps(result, sort_keys=True) + "\n"
+        if args.json == "-":
+            sys.stdout.write(line)
+        else:
+            with open(args.json, "w") as f:
+                f.write(line)
+
+    if args.json != "-":
+        print(f"{'startup to main menu':<30} median {result['median_s'] * 1000:10.3f} ms  min {result['min_s'] * 1000:10.3f} ms")
+        print(f"{'imports':<30} {result['imports_s'] * 1000:17.3f} ms  project {result['project_imports_s'] * 1000:8.3f} ms")
+        print("slowest imports (self time) of the last launch:")
+        for name, self_us, cumulative_us in sorted(modules, key=lambda module: module[1], reverse=True)[: args.top]:
+            print(f"  {name:<40} {self_us / 1000:8.3f} ms  cumulative {cumulative_us / 1000:8.3f} ms")
+
+    if result["median_s"] * 1000 > args.budget:
+        raise SystemExit(
+            f"Startup took {result['median_s'] * 1000:.1f} ms, over the {args.budget:.0f} ms budget."
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# build oversized, crowded floors to measure the hot paths well beyond normal load
+from __future__ import annotations
+
+import random
+from typing import Dict, Optional, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from src.game_map import GameMap
+import src.procgen as procgen
+import src.tile_types as tile_types
+
+if TYPE_CHECKING:
+    from src.engine import Engine
+
+# fraction of floor tiles holding a monster and an item for each preset
+DENSITIES: Dict[str, Tuple[float, float]] = {
+    "normal": (0.01, 0.005),
+    "crowded": (0.05, 0.02),
+    "swarm": (0.20, 0.05),
+}
+
+CELL_SIZE = 12 # rooms are laid out on a grid of cells this size, so every room is reachable
+
+def carve_rooms(dungeon: GameMap) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    # fill the map with a grid of rooms, each joined to its right and lower neighbours
+    # return the centers of the first and last rooms
+    columns = max(1, (dungeon.width - 2) // CELL_SIZE)
+    rows = max(1, (dungeon.height - 2) // CELL_SIZE)
+    centers = np.zeros((columns, rows, 2), dtype=int)
+
+    for column in range(columns):
+        for row in range(rows):
+            width = min(random.randint(6, CELL_SIZE - 2), dungeon.width - 2)
+            height = min(random.randint(6, CELL_SIZE - 2), dungeon.height - 2)
+            room = procgen.RectangularRoom(
+                column * CELL_SIZE + random.randint(0, CELL_SIZE - width - 1),
+                row * CELL_SIZE + random.randint(0, CELL_SIZE - height - 1),
+                width,
+                height,
+            )
+            dungeon.tiles[room.inner] = tile_types.floor
+            centers[column, row] = room.center
+
+    for column in range(columns):
+        for row in range(rows):
+            x1, y1 = centers[column, row]
+            neighbours = []
+            if column + 1 < columns:
+                neighbours.append(centers[column + 1, row])
+            if row + 1 < rows:
+                neighbours.append(centers[column, row + 1])
+
+            for x2, y2 in neighbours:
+                # L-shaped tunnel, carved with slices instead of tile by tile
+                dungeon.tiles[min(x1, x2) : max(x1, x2) + 1, y1] = tile_types.floor
+                dungeon.tiles[x2, min(y1, y2) : max(y1, y2) + 1] = tile_types.floor
+
+    first_x, first_y = centers[0, 0]
+    last_x, last_y = centers[-1, -1]
+    return (int(first_x), int(first_y)), (int(last_x), int(last_y))
+
+def build_scenario(
+    engine: Engine,
+    map_width: int,
+    map_height: int,
+    density: str = "normal",
+    monsters: Optional[int] = None,
+    items: Optional[int] = None,
+    seed: Optional[int] = None,
+) -> GameMap:
+    """
+        replace the engine's current floor with a `map_width` x `map_height` floor
+        populated according to a `density` preset, `monsters` and `items` override
+        the preset counts. Everything is placed through `Entity.spawn`
+    """
+    if seed is not None:
+        random.seed(seed)
+
+    floor = engine.game_world.current_floor
+    dungeon = GameMap(engine, map_width, map_height)
+    engine.game_map = dungeon
+
+    start, downstairs = carve_rooms(dungeon)
+    engine.player.place(*start, dungeon)
+    dungeon.tiles[downstairs] = tile_types.down_stairs
+    dungeon.downstairs_location = downstairs
+
+    free = dungeon.tiles["walkable"].copy()
+    free[start] = False
+    free_xs, free_ys = np.nonzero(free)
+
+    monster_density, item_density = DENSITIES[density]
+    if monsters is None:
+        monsters = int(len(free_xs) * monster_density)
+    if items is None:
+        items = int(len(free_xs) * item_density)
+
+    # monsters and items never share a tile, like a normal floor
+    chosen = random.sample(range(len(free_xs)), min(monsters + items, len(free_xs)))
+    entities = procgen.get_entities_at_random(
+        procgen.get_enemy_chances(), min(monsters, len(chosen)), floor
+    ) + procgen.get_entities_at_random(
+        procgen.get_item_chances(), max(0, len(chosen) - monsters), floor
+    )
+    for entity, index in zip(entities, chosen):
+        entity.spawn(dungeon, int(free_xs[index]), int(free_ys[index]))
+
+    engine.update_fov()
+    return dungeon
@@ -0,0 +1,264 @@
+# step many independent environments in lockstep, in this process or sharded across worker processes
+from __future__ import annotations
+
+import multiprocessing
+from multiprocessing import shared_memory
+from multiprocessing.connection import Connection
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import src.constants as constants
+from src.environment import RoguelikeEnv
+
+MAX_ACTORS = 64 # actor arrays are padded or truncated to this many slots when stacked
+
+def observation_spec(
+    map_width: int, map_height: int, max_actors: int = MAX_ACTORS
+) -> Dict[str, Tuple[Tuple[int, ...], np.dtype]]:
+    # shape and dtype of one environment's row in each stacked buffer
+    map_shape = (map_width, map_height)
+    return {
+        "walkable": (map_shape, np.dtype(bool)),
+        "visible": (map_shape, np.dtype(bool)),
+        "explored": (map_shape, np.dtype(bool)),
+        "actor_x": ((max_actors,), np.dtype(np.int32)),
+        "actor_y": ((max_actors,), np.dtype(np.int32)),
+        "actor_hp": ((max_actors,), np.dtype(np.int32)),
+        "actor_alive": ((max_actors,), np.dtype(bool)),
+        "player_slot": ((), np.dtype(np.int64)),
+        "reward": ((), np.dtype(np.float64)),
+        "done": ((), np.dtype(bool)),
+        "action": ((), np.dtype(np.int64)),
+    }
+
+def allocate_buffers(
+    spec: Dict[str, Tuple[Tuple[int, ...], np.dtype]],
+    num_envs: int,
+    shared: bool = False,
+) -> Tuple[Dict[str, np.ndarray], List[shared_memory.SharedMemory]]:
+    # one (num_envs, *shape) array per spec entry, backed by shared memory if requested
+    buffers = {}
+    blocks = []
+    for name, (shape, dtype) in spec.items():
+        full_shape = (num_envs, *shape)
+        if shared:
+            size = max(1, int(np.prod(full_shape)) * dtype.itemsize)
+            block = shared_memory.SharedMemory(create=True, size=size)
+            blocks.append(block)
+            buffers[name] = np.ndarray(full_shape, dtype=dtype, buffer=block.buf)
+            buffers[name][...] = 0
+        else:
+            buffers[name] = np.zeros(full_shape, dtype=dtype)
+    return buffers, blocks
+
+def attach_buffers(
+    spec: Dict[str, Tuple[Tuple[int, ...], np.dtype]],
+    num_envs: int,
+    names: Dict[str, str],
+) -> Tuple[Dict[str, np.ndarray], List[shared_memory.SharedMemory]]:
+    # map buffers created by `allocate_buffers` in another process
+    buffers = {}
+    blocks = []
+    for name, (shape, dtype) in spec.items():
+        block = shared_memory.SharedMemory(name=names[name])
+        blocks.append(block)
+        buffers[name] = np.ndarray((num_envs, *shape), dtype=dtype, buffer=block.buf)
+    return buffers, blocks
+
+class EnvShard:
+    """
+        a contiguous range of environments writing into rows `start` to `stop` of the
+        stacked buffers, used directly by VectorEnv or inside a worker process
+    """
+
+    def __init__(
+        self,
+        buffers: Dict[str, np.ndarray],
+        start: int,
+        stop: int,
+        character_cls: str,
+        map_width: int,
+        map_height: int,
+    ):
+        self.buffers = buffers
+        self.start = start
+        self.envs = [
+            RoguelikeEnv(character_cls, map_width, map_height) for _ in range(start, stop)
+        ]
+        self.seeds: List[Optional[int]] = [None] * len(self.envs)
+
+    def write_observation(self, row: int, observation: Dict[str, np.ndarray]) -> None:
+        buffers = self.buffers
+        for name in ("walkable", "visible", "explored", "player_slot"):
+            buffers[name][row] = observation[name]
+
+        # actor slots past the padded width are dropped, unused ones read as dead
+        count = min(len(observation["actor_x"]), buffers["actor_x"].shape[1])
+        for name in ("actor_x", "actor_y", "actor_hp", "actor_alive"):
+            buffers[name][row, :count] = observation[name][:count]
+            buffers[name][row, count:] = 0
+
+    def reset(self, seed: Optional[int] = None) -> None:
+        for i, env in enumerate(self.envs):
+            row = self.start + i
+            self.seeds[i] = None if seed is None else seed + row
+            self.write_observation(row, env.reset(self.seeds[i]))
+            self.buffers["reward"][row] = 0.0
+            self.buffers["done"][row] = False
+
+    def step(self) -> List[Dict[str, Any]]:
+        # step every environment with its row of the action buffer
+        # finished episodes are reset straight away, their info keeps the final state
+        infos = []
+        for i, env in enumerate(self.envs):
+            row = self.start + i
+            observation, reward, done, info = env.step(int(self.buffers["action"][row]))
+            if done:
+                if self.seeds[i] is not None:
+                    self.seeds[i] += len(self.buffers["action"])
+                observation = env.reset(self.seeds[i])
+            self.write_observation(row, observation)
+            self.buffers["reward"][row] = reward
+            self.buffers["done"][row] = done
+            infos.append(info)
+        return infos
+
+def _worker(
+    conn: Connection,
+    spec: Dict[str, Tuple[Tuple[int, ...], np.dtype]],
+    num_envs: int,
+    names: Dict[str, str],
+    start: int,
+    stop: int,
+    character_cls: str,
+    map_width: int,
+    map_height: int,
+) -> None:
+    buffers, blocks = attach_buffers(spec, num_envs, names)
+    shard = EnvShard(buffers, start, stop, character_cls, map_width, map_height)
+    try:
+        while True:
+            command, argument = conn.recv()
+            if command == "reset":
+                shard.reset(argument)
+                conn.send(None)
+            elif command == "step":
+                conn.send(shard.step())
+            elif command == "close":
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        del buffers, shard
+        for block in blocks:
+            block.close()
+        conn.close()
+
+class VectorEnv:
+    """
+        `num_envs` independent RoguelikeEnv instances stepped in lockstep
+        observations, rewards and dones are gathered into stacked numpy arrays with the
+        environment index as the first axis. With `workers` > 0 the environments are
+        sharded across worker processes which write straight into shared memory buffers
+
+        the returned arrays are reused by the next step, copy them to keep them around
+    """
+
+    def __init__(
+        self,
+        num_envs: int,
+        character_cls: str = constants.ENTITY_PLAYER_TYPE_HUMAN,
+        workers: int = 0,
+        map_width: int = 80,
+        map_height: int = 43,
+        max_actors: int = MAX_ACTORS,
+    ):
+        self.num_envs = num_envs
+        self.workers = min(workers, num_envs)
+        spec = observation_spec(map_width, map_height, max_actors)
+        self.buffers, self._blocks = allocate_buffers(spec, num_envs, shared=self.workers > 0)
+
+        self._shard: Optional[EnvShard] = None
+        self._connections: List[Connection] = []
+        self._processes: List[multiprocessing.Process] = []
+
+        if not self.workers:
+            self._shard = EnvShard(self.buffers, 0, num_envs, character_cls, map_width, map_height)
+            return
+
+        names = {name: block.name for name, block in zip(spec, self._blocks)}
+        bounds = np.linspace(0, num_envs, self.workers + 1).astype(int)
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            parent_conn, child_conn = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_worker,
+                args=(
+                    child_conn, spec, num_envs, names, int(start), int(stop),
+                    character_cls, map_width, map_height,
+                ),
+                daemon=True,
+            )
+            process.start()
+            child_conn.close()
+            self._connections.append(parent_conn)
+            self._processes.append(process)
+
+    @property
+    def observations(self) -> Dict[str, np.ndarray]:
+        return {
+            name: array for name, array in self.buffers.items()
+            if name not in ("reward", "done", "action")
+        }
+
+    def reset(self, seed: Optional[int] = None) -> Dict[str, np.ndarray]:
+        # environment i is seeded with `seed + i`
+        if self._shard is not None:
+            self._shard.reset(seed)
+        else:
+            for conn in self._connections:
+                conn.send(("reset", seed))
+            for conn in self._connections:
+                conn.recv()
+        return self.observations
+
+    def step(
+        self, actions: Sequence[int]
+    ) -> Tuple[Dict[str, np.ndarray], np.ndarray, np.ndarray, List[Dict[str, Any]]]:
+        self.buffers["action"][:] = actions
+        if self._shard is not None:
+            infos = self._shard.step()
+        else:
+            for conn in self._connections:
+                conn.send(("step", None))
+            infos = []
+            for conn in self._connections:
+                infos.extend(conn.recv())
+        return self.observations, self.buffers["reward"], self.buffers["done"], infos
+
+    def close(self) -> None:
+        for conn in self._connections:
+            try:
+                conn.send(("close", None))
+            except (BrokenPipeError, OSError):
+                pass # the worker already exited
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for conn in self._connections:
+            conn.close()
+        self._connections = []
+        self._processes = []
+
+        self.buffers = {}
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self) -> VectorEnv:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()